@@ -5,7 +5,7 @@ Flask应用工厂
 """
 from flask import Flask, send_from_directory
 from flask_cors import CORS
-from flask_socketio import SocketIO
+from flask_socketio import SocketIO, emit, join_room
 import logging
 from backend.config import config
 from backend.models import db
@@ -18,6 +18,14 @@ from pathlib import Path
 # ValueError('Invalid async_mode specified')），则回退到不显式传递 async_mode
 # 让库自动检测可用模式。
 logger = logging.getLogger('backend.app')
+
+# Socket.IO房间：管理员（含大屏）接收得票数，投票者只接收轻量通知
+ROOM_ADMIN = 'admin'
+ROOM_VOTER = 'voter'
+# 连接时指定 schema=compact 的管理员，票数快照以紧凑格式推送
+ROOM_ADMIN_COMPACT = 'admin:compact'
+ROOM_ADMINS = [ROOM_ADMIN, ROOM_ADMIN_COMPACT]
+
 try:
     socketio = SocketIO(cors_allowed_origins="*", async_mode='threading')
 except ValueError as e:
@@ -45,6 +53,14 @@ def create_app(config_name='default'):
     # 配置session密钥
     app.secret_key = app.config['SECRET_KEY']
     
+    # 选择JSON编码器（安装了orjson时优先使用）
+    from backend.utils.json_provider import init_json_provider
+    init_json_provider(app)
+    
+    # 响应压缩（gzip，安装了brotli时优先br）
+    from backend.utils.compression import init_compression, static_files
+    init_compression(app)
+    
     # 初始化扩展
     from backend.models import db
     db.init_app(app)
@@ -66,8 +82,17 @@ def create_app(config_name='default'):
     
     # 创建数据库表
     with app.app_context():
+        # 应用SQLite性能配置（WAL模式、PRAGMA与定期检查点）
+        from backend.utils.sqlite_profile import init_sqlite_profile
+        init_sqlite_profile(app, db.engine)
+        
         db.create_all()
         
+        # 为已有数据库补建新增的索引
+        from backend.models.upgrade import upgrade_schema, check_query_plans
+        upgrade_schema()
+        check_query_plans()
+        
         # 创建默认管理员用户（如果不存在）
         from backend.models import AdminUser
         admin_username = app.config['ADMIN_USERNAME']
@@ -82,20 +107,69 @@ def create_app(config_name='default'):
             db.session.add(admin_user)
             db.session.commit()
             print(f'创建默认管理员用户: {admin_username}')
+        
+        # 从数据库加载投票者额度账本
+        from backend.services.voter_ledger import voter_ledger
+        voter_ledger.load()
+        
+        # 从数据库生成投票统计快照
+        from backend.services.vote_stats import vote_stats
+        vote_stats.configure(app.config['EXPECTED_AUDIENCE'])
+        vote_stats.rebuild()
+        
+        # 从数据库回填投票时间序列
+        from backend.services.vote_timeline import vote_timeline
+        vote_timeline.configure(app.config['VOTE_TIMELINE_BUCKET_SECONDS'], app.config['VOTE_TIMELINE_MAX_BUCKETS'])
+        vote_timeline.load()
+        
+        # 建立候选人搜索索引
+        from backend.services.candidate_search import candidate_search
+        candidate_search.rebuild()
+        if not candidate_search.pinyin_enabled:
+            print('未安装pypinyin，候选人搜索不支持拼音匹配')
+        
+        # 加载抽奖候选池
+        from backend.services.lottery_pool import lottery_pool
+        lottery_pool.load()
+    
+    # 配置投票幂等键缓存
+    from backend.utils.idempotency import vote_idempotency
+    vote_idempotency.configure(app.config['IDEMPOTENCY_MAX_KEYS'], app.config['IDEMPOTENCY_TTL'])
+    
+    # 配置结果事件流
+    from backend.services.result_stream import result_stream
+    result_stream.configure(
+        app.config['SSE_BUFFER_SIZE'], app.config['SSE_HEARTBEAT_INTERVAL'], app.config['SSE_MAX_SUBSCRIBERS']
+    )
+    
+    # 配置限流令牌桶数量上限
+    from backend.utils.rate_limit import rate_limiter
+    rate_limiter.max_buckets = app.config['RATE_LIMIT_MAX_CLIENTS']
+    
+    # 启动投票批量写入线程（可选）
+    if app.config['VOTE_WRITER_ENABLED']:
+        from backend.services.vote_writer import vote_writer
+        vote_writer.start(app)
     
     # 注册蓝图
     from backend.routes.admin import admin_bp
     from backend.routes.vote import vote_bp
     from backend.routes.lottery import lottery_bp
+    from backend.routes.stream import stream_bp
     
     app.register_blueprint(admin_bp)
     app.register_blueprint(vote_bp)
     app.register_blueprint(lottery_bp)
+    app.register_blueprint(stream_bp)
     
     # 获取项目根目录
     base_dir = Path(__file__).resolve().parent.parent
     frontend_dir = base_dir / 'frontend'
     
+    # 预压缩前端页面和脚本
+    if app.config['COMPRESSION_ENABLED']:
+        static_files.preload(frontend_dir)
+    
     # 静态文件路由
     @app.route('/uploads/<path:filename>')
     def uploaded_file(filename):
@@ -145,17 +219,17 @@ def create_app(config_name='default'):
             return redirect('/welcome')
         
         # PC端显示完整首页
-        return send_from_directory(frontend_dir, 'index.html')
+        return static_files.send(frontend_dir, 'index.html')
     
     @app.route('/welcome')
     def welcome():
         """欢迎页面 - 连接WiFi后的引导页"""
-        return send_from_directory(frontend_dir, 'welcome.html')
+        return static_files.send(frontend_dir, 'welcome.html')
     
     @app.route('/wifi-guide')
     def wifi_guide():
         """WiFi连接引导页 - 一码通方案"""
-        return send_from_directory(frontend_dir, 'wifi_guide.html')
+        return static_files.send(frontend_dir, 'wifi_guide.html')
     
     # Captive Portal探测端点
     @app.route('/generate_204')
@@ -200,17 +274,17 @@ def create_app(config_name='default'):
     def admin_static(filename):
         """管理后台静态文件"""
         print(f'请求静态文件: /admin/{filename}')  # 调试日志
-        return send_from_directory(frontend_dir / 'admin', filename)
+        return static_files.send(frontend_dir / 'admin', filename)
     
     @app.route('/vote/<path:filename>')
     def vote_static(filename):
         """投票页面静态文件"""
-        return send_from_directory(frontend_dir / 'vote', filename)
+        return static_files.send(frontend_dir / 'vote', filename)
     
     @app.route('/lottery/<path:filename>')
     def lottery_static(filename):
         """抽奖页面静态文件"""
-        return send_from_directory(frontend_dir / 'lottery', filename)
+        return static_files.send(frontend_dir / 'lottery', filename)
     
     # 页面路由 - 在静态资源路由之后注册
     @app.route('/admin')
@@ -221,32 +295,53 @@ def create_app(config_name='default'):
         # 检查是否已登录
         if not session.get('admin_logged_in'):
             # 未登录，跳转到登录页面
-            return send_from_directory(frontend_dir / 'admin', 'login.html')
+            return static_files.send(frontend_dir / 'admin', 'login.html')
         # 已登录，显示管理后台
-        return send_from_directory(frontend_dir / 'admin', 'index.html')
+        return static_files.send(frontend_dir / 'admin', 'index.html')
     
     @app.route('/admin/login')
     def admin_login():
         """管理后台登录页面"""
-        return send_from_directory(frontend_dir / 'admin', 'login.html')
+        return static_files.send(frontend_dir / 'admin', 'login.html')
     
     @app.route('/vote')
     @app.route('/vote/')
     def vote():
         """投票页面"""
-        return send_from_directory(frontend_dir / 'vote', 'index.html')
+        return static_files.send(frontend_dir / 'vote', 'index.html')
     
     @app.route('/lottery')
     @app.route('/lottery/')
     def lottery():
         """抽奖页面"""
-        return send_from_directory(frontend_dir / 'lottery', 'index.html')
+        return static_files.send(frontend_dir / 'lottery', 'index.html')
+    
+    # 启动投票增量广播后台任务
+    from backend.services.vote_broadcaster import vote_broadcaster
+    vote_broadcaster.start(app)
     
     # WebSocket事件
     @socketio.on('connect')
     def handle_connect():
-        """客户端连接"""
+        """客户端连接（含断线重连），按登录状态加入房间"""
+        from flask import session
         print('客户端已连接')
+        if not session.get('admin_logged_in'):
+            # 普通投票者只接收轻量通知，不接收得票数
+            join_room(ROOM_VOTER)
+            return
+        
+        # 管理后台和大屏加入管理员房间，并发送当前票数快照
+        from flask import request
+        from backend.models import Candidate
+        from backend.utils.candidate_schema import to_compact
+        candidates = [c.to_dict() for c in Candidate.query.order_by(Candidate.id).all()]
+        if request.args.get('schema') == 'compact':
+            join_room(ROOM_ADMIN_COMPACT)
+            emit('vote_update', {'candidates': to_compact(candidates)})
+        else:
+            join_room(ROOM_ADMIN)
+            emit('vote_update', {'candidates': candidates})
     
     @socketio.on('disconnect')
     def handle_disconnect():
@@ -258,12 +353,51 @@ def create_app(config_name='default'):
 
 def broadcast_vote_update(candidate_data):
     """
-    广播投票更新
+    广播投票更新（仅管理员房间，投票者收到结果变化通知）
     
     Args:
         candidate_data: 候选人数据
     """
-    socketio.emit('vote_update', candidate_data, namespace='/')
+    socketio.emit('vote_update', candidate_data, namespace='/', to=ROOM_ADMIN)
+    from backend.utils.candidate_schema import to_compact
+    compact_data = dict(candidate_data, candidates=to_compact(candidate_data['candidates']))
+    socketio.emit('vote_update', compact_data, namespace='/', to=ROOM_ADMIN_COMPACT)
+    broadcast_results_changed()
+
+
+def broadcast_vote_delta(votes):
+    """
+    广播票数增量（仅管理员房间）
+    
+    Args:
+        votes: {候选人ID: 最新票数}
+    """
+    socketio.emit('vote_delta', {'votes': votes}, namespace='/', to=ROOM_ADMINS)
+
+
+def broadcast_vote_timeline(buckets):
+    """
+    广播投票时间序列中发生变化的桶（仅管理员房间）
+    
+    Args:
+        buckets: [{'t': 桶起始时间戳, 'counts': {候选人ID: 桶内票数}}]
+    """
+    socketio.emit('vote_timeline', {'buckets': buckets}, namespace='/', to=ROOM_ADMINS)
+
+
+def broadcast_results_changed():
+    """通知投票者投票结果已变化（不含得票数）"""
+    socketio.emit('results_changed', namespace='/', to=ROOM_VOTER)
+
+
+def broadcast_vote_config(config_data):
+    """
+    广播投票配置变更
+    
+    Args:
+        config_data: 投票配置数据
+    """
+    socketio.emit('vote_config', config_data, namespace='/')
 
 
 def broadcast_lottery_result(lottery_data):
@@ -22,6 +22,20 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # SQLite性能配置（仅在使用SQLite时生效）
+    SQLITE_POOL_OPTIONS = {  # 文件型SQLite的连接池大小，避免高并发投票时等待连接
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_timeout': 30,
+    }
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 10000))  # 数据库被锁定时的等待时间（毫秒）
+    SQLITE_CACHE_SIZE_KB = 32 * 1024  # 每个连接的页缓存大小（KB）
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024  # 内存映射读取大小（字节）
+    SQLITE_TEMP_STORE = 'MEMORY'  # 临时表和索引存放在内存中
+    SQLITE_CHECKPOINT_INTERVAL = 60  # WAL检查点间隔（秒），0表示不定期执行
+    
     # 上传配置
     UPLOAD_FOLDER = BASE_DIR / 'uploads'
     PHOTO_FOLDER = UPLOAD_FOLDER / 'photos'
@@ -40,6 +54,57 @@ class Config:
     # 投票配置
     VOTE_LIMIT_PER_IP = 1  # 每个IP最多投票次数
     VOTE_SESSION_TIMEOUT = 86400  # 投票会话超时时间（秒）
+    EXPECTED_AUDIENCE = int(os.getenv('EXPECTED_AUDIENCE', 100))  # 预计到场人数（用于计算投票完成率和参与率）
+    
+    # 投票批量写入配置（组提交，默认关闭）
+    VOTE_WRITER_ENABLED = os.getenv('VOTE_WRITER_ENABLED', 'false').lower() == 'true'
+    VOTE_WRITER_BATCH_SIZE = int(os.getenv('VOTE_WRITER_BATCH_SIZE', 64))  # 每批最多写入票数
+    VOTE_WRITER_FLUSH_INTERVAL_MS = int(os.getenv('VOTE_WRITER_FLUSH_INTERVAL_MS', 20))  # 批次最长等待时间（毫秒）
+    VOTE_WRITER_TIMEOUT = 10  # 请求等待批次提交的超时时间（秒）
+    
+    # 投票广播配置
+    VOTE_BROADCAST_INTERVAL_MS = 250  # 票数增量合并广播间隔（毫秒）
+    VOTE_RESULTS_NOTIFY_INTERVAL = 5  # 向投票者发送结果变化通知的最小间隔（秒）
+    
+    # 列表接口分页配置
+    PAGE_SIZE_DEFAULT = 50  # 默认每页数量
+    PAGE_SIZE_MAX = 500  # 每页最大数量
+    
+    # JSON编码器：auto（安装了orjson时使用orjson）、orjson、stdlib
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'auto')
+    
+    # 响应压缩配置（gzip，安装了brotli时优先br）
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = 1024  # 小于该大小（字节）的响应不压缩
+    
+    # 公开候选人列表预先生成gzip压缩版本（客户端支持时直接发送）
+    PUBLIC_CANDIDATES_GZIP = True
+    
+    # 投票时间序列配置（管理端票数曲线）
+    VOTE_TIMELINE_BUCKET_SECONDS = 60  # 每个时间桶的时长（秒）
+    VOTE_TIMELINE_MAX_BUCKETS = 240  # 最多保留的时间桶数量
+    
+    # 结果事件流（SSE）配置
+    SSE_BUFFER_SIZE = 256  # 保留的最近事件数量（用于断线重连补发）
+    SSE_HEARTBEAT_INTERVAL = 15  # 无事件时的心跳间隔（秒）
+    SSE_MAX_SUBSCRIBERS = 50  # 最多同时订阅的客户端数量（每个订阅占用一个线程，断开后在下次心跳时释放）
+    
+    # 投票幂等键配置（客户端超时重试时返回首次结果）
+    IDEMPOTENCY_MAX_KEYS = 20000  # 最多缓存的幂等键数量
+    IDEMPOTENCY_TTL = 600  # 幂等键保留时间（秒）
+    IDEMPOTENCY_WAIT_TIMEOUT = 10  # 同键请求等待首个请求完成的超时时间（秒）
+    
+    # 接口限流配置（令牌桶：每秒补充令牌数, 桶容量）
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_BY_FINGERPRINT = False  # 是否按 IP + 设备指纹分别限流（多台设备共用出口IP时开启）
+    RATE_LIMIT_MAX_CLIENTS = 10000  # 最多保留的令牌桶数量，超出后淘汰最久未使用的
+    RATE_LIMITS = {
+        'vote_submit': (2, 10),
+        'vote_ballot': (1, 5),
+        'vote_check': (1, 5),
+        'vote_statistics': (1, 5),
+        'vote_search': (5, 20),
+    }
     
     # 抽奖配置
     LOTTERY_ANIMATION_DURATION = 5  # 抽奖动画持续时间（秒）
@@ -56,6 +121,13 @@ class Config:
         os.makedirs(Config.PHOTO_FOLDER, exist_ok=True)
         os.makedirs(Config.FILE_FOLDER, exist_ok=True)
         os.makedirs(BASE_DIR / 'database', exist_ok=True)
+        
+        # 文件型SQLite数据库使用更大的连接池（内存数据库使用单连接，不支持这些参数）
+        database_uri = app.config['SQLALCHEMY_DATABASE_URI']
+        if database_uri.startswith('sqlite:///') and ':memory:' not in database_uri:
+            engine_options = dict(app.config['SQLITE_POOL_OPTIONS'])
+            engine_options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+            app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
 
 
 class DevelopmentConfig(Config):
@@ -20,6 +20,11 @@ class Candidate(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # 排行榜与统计接口按票数降序排列
+        db.Index('ix_candidates_votes', votes.desc(), id),
+    )
+    
     # 关系
     vote_records = db.relationship('Vote', backref='candidate', lazy='dynamic', cascade='all, delete-orphan')
     lottery_records = db.relationship('LotteryRecord', backref='candidate', lazy='dynamic', cascade='all, delete-orphan')
@@ -27,8 +32,34 @@ class Candidate(db.Model):
     def __repr__(self):
         return f'<Candidate {self.name}>'
     
+    # 序列化结果缓存：候选人ID -> (缓存键, 字典)
+    _dict_cache = {}
+    
     def to_dict(self):
-        """转换为字典"""
+        """转换为字典（数据未变化时复用缓存的结果，返回副本）"""
+        # 资料修改会更新updated_at；得票数单独变化，不更新updated_at
+        key = (self.updated_at, self.votes, self.photo_path)
+        cached = Candidate._dict_cache.get(self.id)
+        if cached is not None and cached[0] == key:
+            return dict(cached[1])
+        
+        data = self._build_dict()
+        if self.id is not None:
+            Candidate._dict_cache[self.id] = (key, data)
+        return dict(data)
+    
+    @classmethod
+    def forget_dict(cls, candidate_id: int):
+        """移除已删除候选人的序列化缓存"""
+        cls._dict_cache.pop(candidate_id, None)
+    
+    @classmethod
+    def clear_dict_cache(cls):
+        """清空序列化缓存（批量导入后调用）"""
+        cls._dict_cache.clear()
+    
+    def _build_dict(self):
+        """生成字典"""
         # 修复照片路径：确保图片URL正确
         photo_url = self.photo_path
         
@@ -59,6 +90,16 @@ class Candidate(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
     
+    @staticmethod
+    def increment_votes(candidate_id, count=1):
+        """原子地增加候选人票数（不提交事务）"""
+        # 得票不算资料修改，保持updated_at不变，公开的候选人列表不随投票变化
+        db.session.execute(
+            db.update(Candidate)
+            .where(Candidate.id == candidate_id)
+            .values(votes=Candidate.votes + count, updated_at=Candidate.updated_at)
+        )
+    
     @staticmethod
     def from_dict(data):
         """从字典创建候选人"""
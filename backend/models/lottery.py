@@ -39,7 +39,12 @@ class LotteryRecord(db.Model):
         return max_round or 0
     
     @staticmethod
-    def get_winners_ids():
-        """获取所有中奖者ID列表"""
-        winners = db.session.query(LotteryRecord.candidate_id).distinct().all()
-        return [w[0] for w in winners]
\ No newline at end of file
+    def not_won():
+        """
+        候选人未中奖条件（NOT EXISTS 反连接）
+        
+        按 candidate_id 索引逐个检查，不需要把中奖者ID作为 NOT IN 参数列表传入，
+        中奖人数再多也不会超出SQLite的参数数量限制。
+        """
+        from .candidate import Candidate
+        return ~db.exists().where(LotteryRecord.candidate_id == Candidate.id)
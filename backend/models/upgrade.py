@@ -0,0 +1,102 @@
+"""
+数据库结构升级
+
+db.create_all() 只会创建缺失的表，不会为已存在的表补建新增的索引，
+这里在启动时检查并补建，同时删除已被复合索引取代的旧索引，无需重建数据库。
+
+版权所有 (c) 2025 赵宏宇
+"""
+import logging
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateIndex
+from . import db
+
+logger = logging.getLogger('backend.models')
+
+# 已从模型中移除的索引（与复合索引首列重复，只增加写入开销）
+OBSOLETE_INDEXES = (
+    'ix_votes_voter_ip',
+    'ix_votes_candidate_id',
+)
+
+
+def upgrade_schema():
+    """为已存在的表补建模型中声明的索引，并删除已废弃的索引（需在应用上下文中调用）"""
+    with db.engine.begin() as conn:
+        for name in OBSOLETE_INDEXES:
+            conn.execute(db.text(f'DROP INDEX IF EXISTS {name}'))
+
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                with db.engine.begin() as conn:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+            except IntegrityError as e:
+                # 旧数据中存在重复记录时无法创建唯一索引，保留原有结构继续运行
+                logger.warning('无法创建唯一索引 %s，已有数据存在重复: %s', index.name, e.orig)
+
+
+def _hot_queries():
+    """投票与排行榜的高频查询"""
+    from .candidate import Candidate
+    from .vote import Vote
+    from .lottery import LotteryRecord
+    return {
+        '投票写入（IP + 设备指纹）': Vote.admit_statement(1, '0.0.0.0', 'fingerprint', None, 1),
+        '投票写入（仅IP）': Vote.admit_statement(1, '0.0.0.0', None, None, 1),
+        '用户投票记录': db.select(Vote).where(
+            Vote.voter_ip == '0.0.0.0', Vote.device_fingerprint == 'fingerprint'
+        ),
+        '候选人排行榜': db.select(Candidate).order_by(Candidate.votes.desc()),
+        '投票人数统计': db.select(db.func.count()).select_from(
+            db.select(Vote.voter_ip, Vote.device_fingerprint).distinct().subquery()
+        ),
+        '可抽奖人数': db.select(db.func.count(Candidate.id)).where(LotteryRecord.not_won()),
+    }
+
+
+def find_full_scans(details: list) -> list:
+    """
+    从 EXPLAIN QUERY PLAN 明细中找出未使用索引的全表扫描
+    
+    Args:
+        details: 查询计划明细列表
+        
+    Returns:
+        全表扫描的明细列表
+    """
+    # 子查询的中间结果（CO-ROUTINE/MATERIALIZE）本身不是数据表
+    subqueries = {
+        d.split()[-1] for d in details if d.startswith(('CO-ROUTINE', 'MATERIALIZE'))
+    }
+    return [
+        d for d in details
+        if d.startswith('SCAN') and 'INDEX' not in d and d != 'SCAN CONSTANT ROW'
+        and d.split()[1] not in subqueries
+    ]
+
+
+def check_query_plans() -> dict:
+    """
+    用 EXPLAIN QUERY PLAN 检查高频查询是否走索引（仅SQLite）
+    
+    Returns:
+        {查询名称: 查询计划明细列表}，未走索引的查询会输出警告
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return {}
+    
+    plans = {}
+    with db.engine.connect() as conn:
+        for name, stmt in _hot_queries().items():
+            compiled = stmt.compile(dialect=conn.dialect)
+            # 查询计划与参数取值无关，全部传入NULL即可
+            params = (None,) * len(compiled.positiontup or ())
+            rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled.string}', params).all()
+            details = [row[-1] for row in rows]
+            plans[name] = details
+            
+            full_scans = find_full_scans(details)
+            if full_scans:
+                logger.warning('查询未使用索引 %s: %s', name, '; '.join(full_scans))
+    return plans
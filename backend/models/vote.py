@@ -13,12 +13,25 @@ class Vote(db.Model):
     __tablename__ = 'votes'
     
     id = db.Column(db.Integer, primary_key=True)
-    candidate_id = db.Column(db.Integer, db.ForeignKey('candidates.id'), nullable=False, index=True)
-    voter_ip = db.Column(db.String(45), nullable=False, index=True)
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidates.id'), nullable=False)
+    voter_ip = db.Column(db.String(45), nullable=False)
     device_fingerprint = db.Column(db.String(255), index=True)
     user_agent = db.Column(db.String(500))
     voted_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
+    # candidate_id、voter_ip 不单独建索引：分别是以下两个复合索引的首列，按其查询可直接使用复合索引
+    __table_args__ = (
+        # 同一投票者（IP + 设备指纹）对同一候选人只能投一票；
+        # 设备指纹为空时按空字符串参与唯一性判断（SQLite中NULL互不相等）
+        db.Index(
+            'uq_votes_candidate_voter',
+            candidate_id, voter_ip, db.func.coalesce(device_fingerprint, ''),
+            unique=True
+        ),
+        # 按投票者统计票数、检查是否已给某候选人投票（覆盖索引，无需回表）
+        db.Index('ix_votes_voter_candidate', voter_ip, device_fingerprint, candidate_id),
+    )
+    
     def __repr__(self):
         return f'<Vote candidate_id={self.candidate_id} ip={self.voter_ip}>'
     
@@ -42,6 +55,12 @@ class Vote(db.Model):
             query = query.filter_by(device_fingerprint=fingerprint)
         return query.first() is not None
     
+    @staticmethod
+    def count_unique_voters():
+        """统计不同投票者（IP + 设备指纹）数量"""
+        voters = db.session.query(Vote.voter_ip, Vote.device_fingerprint).distinct().subquery()
+        return db.session.query(db.func.count()).select_from(voters).scalar() or 0
+    
     @staticmethod
     def get_vote_count_by_ip(ip, fingerprint=None):
         """获取IP投票次数"""
@@ -59,3 +78,42 @@ class Vote(db.Model):
         if fingerprint:
             query = query.filter_by(device_fingerprint=fingerprint)
         return query.order_by(Vote.voted_at.desc()).all()
+    
+    @staticmethod
+    def admit(candidate_id, ip, fingerprint=None, user_agent=None, max_votes=1):
+        """
+        原子地写入一票（不提交事务）
+        
+        候选人存在性、重复投票和每人投票上限在同一条INSERT语句中检查，
+        并发请求之间无需依赖读-改-写。
+        
+        Returns:
+            是否写入成功
+        """
+        stmt = Vote.admit_statement(candidate_id, ip, fingerprint, user_agent, max_votes)
+        return db.session.execute(stmt).rowcount == 1
+    
+    @staticmethod
+    def admit_statement(candidate_id, ip, fingerprint=None, user_agent=None, max_votes=1):
+        """构造原子投票的INSERT ... SELECT语句"""
+        voter_filter = [Vote.voter_ip == ip]
+        if fingerprint:
+            voter_filter.append(Vote.device_fingerprint == fingerprint)
+        
+        from .candidate import Candidate
+        candidate_exists = db.select(Candidate.id).where(Candidate.id == candidate_id).exists()
+        already_voted = db.select(Vote.id).where(Vote.candidate_id == candidate_id, *voter_filter).exists()
+        voted_count = db.select(db.func.count(Vote.id)).where(*voter_filter).scalar_subquery()
+        
+        source = db.select(
+            db.literal(candidate_id, db.Integer),
+            db.literal(ip, db.String),
+            db.literal(fingerprint, db.String),
+            db.literal(user_agent, db.String),
+            db.literal(datetime.utcnow(), db.DateTime)
+        ).where(candidate_exists, ~already_voted, voted_count < max_votes)
+        
+        return db.insert(Vote).from_select(
+            ['candidate_id', 'voter_ip', 'device_fingerprint', 'user_agent', 'voted_at'],
+            source
+        )
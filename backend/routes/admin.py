@@ -11,7 +11,15 @@ from backend.services.qrcode_service import QRCodeService
 from backend.services.file_service import FileService
 from backend.services.vote_service import VoteService
 from backend.services.lottery_service import LotteryService
-from backend.utils.response import success_response, error_response
+from backend.services.voter_ledger import voter_ledger
+from backend.services.vote_stats import vote_stats
+from backend.services.vote_timeline import vote_timeline
+from backend.services.candidate_search import candidate_search
+from backend.services.lottery_pool import lottery_pool
+from backend.app import broadcast_vote_config
+from backend.utils.response import success_response, error_response, cursor_response
+from backend.utils.pagination import parse_page_args, paginate_query, project
+from backend.utils.data_version import data_versions, etag, TOPIC_CANDIDATES, TOPIC_VOTES, TOPIC_LOTTERY, TOPIC_CONFIG
 import os
 from datetime import datetime
 
@@ -105,11 +113,21 @@ def check_auth():
 
 @admin_bp.route('/candidates', methods=['GET'])
 @login_required
+@etag(TOPIC_CANDIDATES, TOPIC_VOTES)
 def get_candidates():
-    """获取所有候选人"""
+    """获取所有候选人（支持 cursor/page_size 分页和 fields 字段筛选）"""
     try:
-        candidates = Candidate.query.order_by(Candidate.votes.desc()).all()
-        return success_response([c.to_dict() for c in candidates])
+        page = parse_page_args()
+        if not page.paginate:
+            candidates = Candidate.query.order_by(Candidate.votes.desc()).all()
+            return success_response(project([c.to_dict() for c in candidates], page.fields))
+        
+        candidates, next_cursor = paginate_query(
+            Candidate.query, [(Candidate.votes, True), (Candidate.id, False)], page.cursor, page.page_size
+        )
+        return cursor_response(project([c.to_dict() for c in candidates], page.fields), next_cursor)
+    except ValueError as ve:
+        return error_response(f'分页参数错误: {str(ve)}')
     except Exception as e:
         return error_response(f'获取候选人列表失败: {str(e)}')
 
@@ -159,6 +177,10 @@ def add_candidate():
         
         db.session.add(candidate)
         db.session.commit()
+        vote_stats.update_candidate(candidate.to_dict())
+        candidate_search.upsert(candidate.to_dict())
+        lottery_pool.add(candidate.id)
+        data_versions.bump(TOPIC_CANDIDATES)
         
         return success_response(candidate.to_dict(), '添加成功')
         
@@ -209,6 +231,9 @@ def update_candidate(candidate_id):
                 candidate.photo_path = photo_url
         
         db.session.commit()
+        vote_stats.update_candidate(candidate.to_dict())
+        candidate_search.upsert(candidate.to_dict())
+        data_versions.bump(TOPIC_CANDIDATES)
         
         return success_response(candidate.to_dict(), '更新成功')
         
@@ -253,6 +278,15 @@ def delete_candidate(candidate_id):
         db.session.delete(candidate)
         db.session.commit()
         
+        # 候选人的投票记录已级联删除，重新加载投票者账本、统计快照和时间序列
+        voter_ledger.load()
+        vote_stats.rebuild()
+        vote_timeline.load()
+        candidate_search.remove(candidate_id)
+        lottery_pool.remove(candidate_id)
+        Candidate.forget_dict(candidate_id)
+        data_versions.bump(TOPIC_CANDIDATES, TOPIC_VOTES, TOPIC_LOTTERY)
+        
         return success_response(message='删除成功')
         
     except Exception as e:
@@ -329,6 +363,11 @@ def import_from_file():
             result = FileService.import_candidates_from_csv(filepath)
         
         if result['success']:
+            Candidate.clear_dict_cache()
+            vote_stats.rebuild()
+            candidate_search.rebuild()
+            lottery_pool.load()
+            data_versions.bump(TOPIC_CANDIDATES)
             return success_response(result, result['message'])
         else:
             return error_response(result['message'])
@@ -381,6 +420,7 @@ def export_template():
 # ============ 投票管理 ============
 
 @admin_bp.route('/votes/statistics', methods=['GET'])
+@etag(TOPIC_CANDIDATES, TOPIC_VOTES, TOPIC_CONFIG)
 def get_vote_statistics():
     """获取投票统计"""
     try:
@@ -393,13 +433,52 @@ def get_vote_statistics():
         return error_response(f'获取统计失败: {str(e)}')
 
 
+@admin_bp.route('/votes/statistics/verify', methods=['POST'])
+@login_required
+def verify_vote_statistics():
+    """核对统计快照与数据库，不一致时重建"""
+    try:
+        result = vote_stats.verify()
+        if not result['consistent']:
+            data_versions.bump(TOPIC_CANDIDATES, TOPIC_VOTES)
+        message = '统计数据一致' if result['consistent'] else '统计数据不一致，已从数据库重建'
+        return success_response(result, message)
+    except Exception as e:
+        return error_response(f'核对统计失败: {str(e)}')
+
+
+@admin_bp.route('/votes/timeline', methods=['GET'])
+@login_required
+def get_vote_timeline():
+    """获取各候选人票数随时间变化的列式数据"""
+    try:
+        candidate_ids = request.args.get('candidate_ids')
+        if candidate_ids:
+            try:
+                candidate_ids = [int(cid) for cid in candidate_ids.split(',') if cid.strip()]
+            except ValueError:
+                return error_response('候选人ID格式错误')
+        else:
+            candidate_ids = None
+        return success_response(vote_timeline.get_series(candidate_ids))
+    except Exception as e:
+        return error_response(f'获取投票趋势失败: {str(e)}')
+
+
 @admin_bp.route('/votes/recent', methods=['GET'])
 def get_recent_votes():
-    """获取最近投票记录"""
+    """获取最近投票记录（支持 cursor/page_size 分页和 fields 字段筛选）"""
     try:
-        limit = request.args.get('limit', 10, type=int)
-        votes = VoteService.get_recent_votes(limit)
-        return success_response(votes)
+        page = parse_page_args()
+        if not page.paginate:
+            limit = request.args.get('limit', 10, type=int)
+            votes = VoteService.get_recent_votes(limit)
+            return success_response(project(votes, page.fields))
+        
+        votes, next_cursor = VoteService.get_recent_votes_page(page.cursor, page.page_size)
+        return cursor_response(project(votes, page.fields), next_cursor)
+    except ValueError as ve:
+        return error_response(f'分页参数错误: {str(ve)}')
     except Exception as e:
         return error_response(f'获取记录失败: {str(e)}')
 
@@ -465,11 +544,19 @@ def draw_lottery():
 
 
 @admin_bp.route('/lottery/history', methods=['GET'])
+@etag(TOPIC_CANDIDATES, TOPIC_LOTTERY)
 def get_lottery_history():
-    """获取抽奖历史"""
+    """获取抽奖历史（支持 cursor/page_size 分页和 fields 字段筛选）"""
     try:
-        history = LotteryService.get_lottery_history()
-        return success_response(history)
+        page = parse_page_args()
+        if not page.paginate:
+            history = LotteryService.get_lottery_history()
+            return success_response(project(history, page.fields))
+        
+        history, next_cursor = LotteryService.get_lottery_history_page(page.cursor, page.page_size)
+        return cursor_response(project(history, page.fields), next_cursor)
+    except ValueError as ve:
+        return error_response(f'分页参数错误: {str(ve)}')
     except Exception as e:
         return error_response(f'获取历史失败: {str(e)}')
 
@@ -499,6 +586,18 @@ def reset_lottery():
         return error_response(f'重置失败: {str(e)}')
 
 
+@admin_bp.route('/lottery/verify', methods=['POST'])
+@login_required
+def verify_lottery_pool():
+    """核对抽奖候选池与数据库，不一致时重新加载"""
+    try:
+        result = lottery_pool.verify()
+        message = '抽奖候选池一致' if result['consistent'] else '抽奖候选池不一致，已从数据库重新加载'
+        return success_response(result, message)
+    except Exception as e:
+        return error_response(f'核对候选池失败: {str(e)}')
+
+
 # 获取和保存抽奖设置的路由
 @admin_bp.route('/lottery/settings', methods=['POST'])
 @login_required
@@ -1007,6 +1106,12 @@ def update_vote_config():
         
         # 更新配置
         config = VoteConfig.update_config(vote_name, max_votes_per_user)
+        voter_ledger.set_max_votes(config.max_votes_per_user)
+        data_versions.bump(TOPIC_CONFIG)
+        broadcast_vote_config({
+            'vote_name': config.vote_name,
+            'max_votes_per_user': config.max_votes_per_user
+        })
         return success_response(config.to_dict(), '配置更新成功')
         
     except Exception as e:
@@ -6,26 +6,38 @@
 from flask import Blueprint
 from backend.models import Candidate
 from backend.services.lottery_service import LotteryService
-from backend.utils.response import success_response, error_response
+from backend.utils.response import success_response, error_response, cursor_response
+from backend.utils.pagination import parse_page_args, project
+from backend.utils.data_version import etag, TOPIC_CANDIDATES, TOPIC_VOTES, TOPIC_LOTTERY
+from backend.utils.candidate_schema import wants_compact, to_compact
 
 lottery_bp = Blueprint('lottery', __name__, url_prefix='/api/lottery')
 
 
 @lottery_bp.route('/candidates', methods=['GET'])
+@etag(TOPIC_CANDIDATES, TOPIC_VOTES)
 def get_candidates():
-    """获取所有候选人（用于抽奖展示）"""
+    """获取所有候选人（用于抽奖展示，支持 ?schema=compact 紧凑格式）"""
     try:
-        candidates = Candidate.query.all()
-        return success_response([c.to_dict() for c in candidates])
+        candidates = [c.to_dict() for c in Candidate.query.all()]
+        return success_response(to_compact(candidates) if wants_compact() else candidates)
     except Exception as e:
         return error_response(f'获取候选人列表失败: {str(e)}')
 
 
 @lottery_bp.route('/history', methods=['GET'])
+@etag(TOPIC_CANDIDATES, TOPIC_LOTTERY)
 def get_history():
-    """获取抽奖历史（公开）"""
+    """获取抽奖历史（公开，支持 cursor/page_size 分页和 fields 字段筛选）"""
     try:
-        history = LotteryService.get_lottery_history()
-        return success_response(history)
+        page = parse_page_args()
+        if not page.paginate:
+            history = LotteryService.get_lottery_history()
+            return success_response(project(history, page.fields))
+        
+        history, next_cursor = LotteryService.get_lottery_history_page(page.cursor, page.page_size)
+        return cursor_response(project(history, page.fields), next_cursor)
+    except ValueError as ve:
+        return error_response(f'分页参数错误: {str(ve)}')
     except Exception as e:
         return error_response(f'获取历史失败: {str(e)}')
@@ -0,0 +1,39 @@
+"""
+事件流路由（Server-Sent Events）
+
+版权所有 (c) 2025 赵宏宇
+"""
+from flask import Blueprint, current_app, request
+from backend.services.result_stream import result_stream
+from backend.utils.response import error_response
+
+stream_bp = Blueprint('stream', __name__, url_prefix='/api/stream')
+
+
+@stream_bp.route('/results', methods=['GET', 'HEAD'])
+def stream_results():
+    """
+    投票结果事件流（公开数据）
+
+    事件：snapshot（完整结果）、delta（{候选人ID: 最新票数}）；
+    无事件时定期发送注释行作为心跳。断线重连时浏览器自动携带
+    Last-Event-ID，服务器补发错过的事件。
+    """
+    if request.method == 'HEAD':
+        # HEAD请求不读取响应体，不占用订阅名额
+        response, code = error_response('请使用GET请求订阅事件流', 405)
+        response.headers['Allow'] = 'GET'
+        return response, code
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    stream = result_stream.open(last_event_id)
+    if stream is None:
+        response, code = error_response('订阅人数已满，请稍后重试', 503)
+        response.headers['Retry-After'] = '10'
+        return response, code
+
+    response = current_app.response_class(stream, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # 禁止反向代理缓冲，事件立即送达
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
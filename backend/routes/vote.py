@@ -4,9 +4,18 @@
 版权所有 (c) 2025 赵宏宇
 """
 from flask import Blueprint, request, session
-from backend.models import Candidate, VoteConfig
+from backend.models import Candidate
 from backend.services.vote_service import VoteService
-from backend.utils.response import success_response, error_response
+from backend.services.voter_ledger import voter_ledger
+from backend.services.vote_stats import vote_stats
+from backend.services.candidate_snapshot import public_candidates
+from backend.services.candidate_search import candidate_search
+from backend.utils.response import success_response, error_response, cursor_response
+from backend.utils.pagination import parse_page_args, project, encode_cursor
+from backend.utils.idempotency import vote_idempotency, idempotent
+from backend.utils.rate_limit import rate_limit
+from backend.utils.data_version import etag, TOPIC_CANDIDATES, TOPIC_VOTES
+from backend.utils.candidate_schema import wants_compact, to_compact
 
 vote_bp = Blueprint('vote', __name__, url_prefix='/api/vote')
 
@@ -26,30 +35,61 @@ def check_admin():
 
 
 @vote_bp.route('/candidates', methods=['GET'])
+@etag(TOPIC_CANDIDATES, admin_topics=(TOPIC_VOTES,))
 def get_candidates():
-    """获取所有候选人（用于投票页面）"""
+    """获取所有候选人（用于投票页面，支持 ?schema=compact 紧凑格式）"""
     try:
         # 检查是否为管理员
         is_admin = session.get('admin_logged_in', False)
+        compact = wants_compact()
         
-        candidates = Candidate.query.order_by(Candidate.id).all()
+        # 非管理员看到的列表完全相同（隐藏得票数），直接发送预先生成的响应体
+        if not is_admin:
+            return public_candidates.response(compact)
         
-        # 如果不是管理员，隐藏得票数
-        candidates_data = []
-        for candidate in candidates:
-            candidate_dict = candidate.to_dict()
-            if not is_admin:
-                candidate_dict['votes'] = 0  # 对非管理员隐藏得票数
-            candidates_data.append(candidate_dict)
-            
-        return success_response(candidates_data)
+        candidates = [c.to_dict() for c in Candidate.query.order_by(Candidate.id).all()]
+        return success_response(to_compact(candidates) if compact else candidates)
     except Exception as e:
         return error_response(f'获取候选人列表失败: {str(e)}')
 
 
+@vote_bp.route('/candidates/search', methods=['GET'])
+@rate_limit('vote_search')
+def search_candidates():
+    """
+    搜索候选人（姓名前缀、拼音全拼/首字母、简介关键词）
+    
+    返回匹配的候选人ID（按 page_size/cursor 分页），候选人资料从候选人列表中获取。
+    """
+    try:
+        query = request.args.get('q', '')
+        page = parse_page_args()
+        
+        ids = candidate_search.search(query)
+        offset = page.cursor[0] if page.cursor else 0
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError('cursor无效')
+        
+        items = ids[offset:offset + page.page_size]
+        next_offset = offset + page.page_size
+        next_cursor = encode_cursor([next_offset]) if next_offset < len(ids) else None
+        return success_response({
+            'items': items,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None,
+            'total': len(ids)
+        })
+    except ValueError as ve:
+        return error_response(f'分页参数错误: {str(ve)}')
+    except Exception as e:
+        return error_response(f'搜索失败: {str(e)}')
+
+
 @vote_bp.route('/submit', methods=['POST'])
+@rate_limit('vote_submit')
+@idempotent(vote_idempotency)
 def submit_vote():
-    """提交投票"""
+    """提交投票（支持 Idempotency-Key 幂等重试）"""
     try:
         data = request.get_json()
         candidate_id = data.get('candidate_id')
@@ -57,6 +97,14 @@ def submit_vote():
         if not candidate_id:
             return error_response('请选择候选人')
         
+        # 账本、统计等内存结构以整数ID为键，"1" 与 1 必须视为同一候选人
+        if isinstance(candidate_id, (bool, float)):
+            return error_response('候选人ID必须是整数')
+        try:
+            candidate_id = int(candidate_id)
+        except (TypeError, ValueError):
+            return error_response('候选人ID必须是整数')
+        
         # 获取投票者信息
         voter_ip = request.remote_addr or ''
         fingerprint = data.get('fingerprint')
@@ -70,6 +118,46 @@ def submit_vote():
             user_agent=user_agent
         )
         
+        if result.get('pending'):
+            # 已进入写入队列但尚未提交
+            return success_response(result, result['message']), 202
+        if result['success']:
+            return success_response(result, result['message'])
+        else:
+            return error_response(result['message'])
+            
+    except Exception as e:
+        return error_response(f'投票失败: {str(e)}')
+
+
+@vote_bp.route('/ballot', methods=['POST'])
+@rate_limit('vote_ballot')
+@idempotent(vote_idempotency)
+def submit_ballot():
+    """一次提交多个候选人的选票（支持 Idempotency-Key 幂等重试）"""
+    try:
+        data = request.get_json()
+        candidate_ids = data.get('candidate_ids')
+        
+        if not candidate_ids or not isinstance(candidate_ids, list):
+            return error_response('请选择候选人')
+        
+        if not all(isinstance(cid, int) and not isinstance(cid, bool) for cid in candidate_ids):
+            return error_response('候选人ID必须是整数')
+        
+        # 获取投票者信息
+        voter_ip = request.remote_addr or ''
+        fingerprint = data.get('fingerprint')
+        user_agent = request.headers.get('User-Agent')
+        
+        # 提交选票
+        result = VoteService.submit_ballot(
+            candidate_ids=candidate_ids,
+            ip=voter_ip,
+            fingerprint=fingerprint,
+            user_agent=user_agent
+        )
+        
         if result['success']:
             return success_response(result, result['message'])
         else:
@@ -83,17 +171,14 @@ def submit_vote():
 def get_vote_config():
     """获取投票配置"""
     try:
-        config = VoteConfig.get_config()
-        
         # 获取当前用户的投票次数
         voter_ip = request.remote_addr
         fingerprint = request.args.get('fingerprint')
         
-        from backend.models import Vote
-        user_vote_count = Vote.get_vote_count_by_ip(voter_ip, fingerprint)
+        user_vote_count = voter_ledger.get_vote_count(voter_ip, fingerprint)
         
         return success_response({
-            'max_votes_per_user': config.max_votes_per_user,
+            'max_votes_per_user': voter_ledger.max_votes,
             'user_vote_count': user_vote_count
         })
         
@@ -102,23 +187,19 @@ def get_vote_config():
 
 
 @vote_bp.route('/check', methods=['GET'])
+@rate_limit('vote_check')
 def check_voted():
     """检查是否已投票"""
     try:
         voter_ip = request.remote_addr
         fingerprint = request.args.get('fingerprint')
         
-        from backend.models import Vote
-        has_voted = Vote.has_voted(voter_ip, fingerprint)
-        
-        # 获取投票配置
-        config = VoteConfig.get_config()
-        user_vote_count = Vote.get_vote_count_by_ip(voter_ip, fingerprint)
+        user_vote_count = voter_ledger.get_vote_count(voter_ip, fingerprint)
         
         return success_response({
-            'has_voted': has_voted,
+            'has_voted': user_vote_count > 0,
             'user_vote_count': user_vote_count,
-            'max_votes_per_user': config.max_votes_per_user
+            'max_votes_per_user': voter_ledger.max_votes
         })
         
     except Exception as e:
@@ -138,10 +219,14 @@ def get_my_votes():
         
         from backend.models import Vote
         if is_admin:
-            # 管理员可以看到所有投票记录
-            votes = Vote.query.order_by(Vote.voted_at.desc()).limit(50).all()
-            # 返回完整投票记录
-            return success_response([v.to_dict() for v in votes])
+            # 管理员可以看到所有投票记录（支持 cursor/page_size 分页和 fields 字段筛选）
+            page = parse_page_args()
+            if not page.paginate:
+                votes = VoteService.get_recent_votes(50)
+                # 返回完整投票记录
+                return success_response(project(votes, page.fields))
+            votes, next_cursor = VoteService.get_recent_votes_page(page.cursor, page.page_size)
+            return cursor_response(project(votes, page.fields), next_cursor)
         else:
             # 普通用户只能看到自己投票的候选人名称
             votes = Vote.get_votes_by_user(voter_ip, fingerprint)
@@ -152,22 +237,19 @@ def get_my_votes():
                 'vote_count': len(candidate_names)
             })
         
+    except ValueError as ve:
+        return error_response(f'分页参数错误: {str(ve)}')
     except Exception as e:
         return error_response(f'获取投票信息失败: {str(e)}')
 
 
 @vote_bp.route('/statistics', methods=['GET'])
+@rate_limit('vote_statistics')
+@etag(TOPIC_CANDIDATES, TOPIC_VOTES)
 def get_statistics():
-    """获取实时投票统计（公开数据）"""
+    """获取实时投票统计（公开数据，支持 ?schema=compact 紧凑格式）"""
     try:
-        stats = VoteService.get_vote_statistics()
-        if stats['success']:
-            # 只返回候选人和票数，不返回投票记录
-            return success_response({
-                'total_votes': stats['total_votes'],
-                'candidates': stats['candidates']
-            })
-        else:
-            return error_response(stats['message'])
+        # 只返回候选人和票数，不返回投票记录；数据未变化时直接发送已序列化的响应体
+        return vote_stats.response(wants_compact())
     except Exception as e:
         return error_response(f'获取统计失败: {str(e)}')
@@ -0,0 +1,152 @@
+"""
+候选人搜索索引
+
+在内存中维护候选人搜索词的有序列表，按前缀二分查找：
+姓名、姓名全拼（zhangsan）、拼音首字母（zs）、简介关键词。
+拼音匹配需要安装 pypinyin（已列入 requirements.txt），未安装时只匹配姓名和简介。
+候选人增删改时增量更新，导入后整体重建。
+"""
+import bisect
+import re
+import threading
+from typing import Any, Dict, List, Tuple
+from backend.models import Candidate
+
+try:
+    from pypinyin import lazy_pinyin, Style
+except ImportError:
+    lazy_pinyin = None
+
+# 匹配类型（数值越小排序越靠前）
+MATCH_NAME = 0
+MATCH_PINYIN = 1
+MATCH_DESCRIPTION = 2
+
+# 简介分词：连续的字母数字，或连续的汉字
+_KEYWORD_PATTERN = re.compile(r'[0-9a-z]+|[\u4e00-\u9fff]+')
+# 汉字没有空格分词，连续汉字的每个后缀都作为搜索词（按前缀匹配即可匹配其中任意位置），限制长度
+_MAX_PHRASE_LENGTH = 32
+
+
+def _terms_for(candidate: Dict[str, Any]) -> List[Tuple[str, int]]:
+    """生成候选人的搜索词 [(词, 匹配类型)]"""
+    name = (candidate.get('name') or '').strip().lower()
+    terms = set()
+    if name:
+        terms.add((name, MATCH_NAME))
+        # 英文名等包含空格的姓名，每个词都可作为前缀匹配
+        for word in name.split():
+            terms.add((word, MATCH_NAME))
+        if lazy_pinyin is not None:
+            syllables = [s.lower() for s in lazy_pinyin(name) if s.strip()]
+            initials = [s.lower() for s in lazy_pinyin(name, style=Style.FIRST_LETTER) if s.strip()]
+            terms.add((''.join(syllables).replace(' ', ''), MATCH_PINYIN))
+            terms.add((''.join(initials).replace(' ', ''), MATCH_PINYIN))
+            # 按音节输入（zhang san）时逐个音节匹配
+            for syllable in syllables:
+                terms.add((syllable, MATCH_PINYIN))
+
+    description = (candidate.get('description') or '').lower()
+    for keyword in _KEYWORD_PATTERN.findall(description):
+        if keyword.isascii():
+            terms.add((keyword, MATCH_DESCRIPTION))
+            continue
+        keyword = keyword[:_MAX_PHRASE_LENGTH]
+        for i in range(len(keyword)):
+            terms.add((keyword[i:], MATCH_DESCRIPTION))
+    return sorted(terms)
+
+
+class CandidateSearchIndex:
+    """候选人搜索索引"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 有序的 (搜索词, 匹配类型, 候选人ID)
+        self._terms: List[Tuple[str, int, int]] = []
+        # 候选人ID -> 该候选人的搜索词
+        self._by_id: Dict[int, List[Tuple[str, int]]] = {}
+
+    @property
+    def pinyin_enabled(self) -> bool:
+        """是否支持拼音匹配"""
+        return lazy_pinyin is not None
+
+    def rebuild(self):
+        """从数据库重建索引（需在应用上下文中调用）"""
+        by_id = {c.id: _terms_for(c.to_dict()) for c in Candidate.query.all()}
+        terms = sorted(
+            (term, kind, candidate_id)
+            for candidate_id, candidate_terms in by_id.items()
+            for term, kind in candidate_terms
+        )
+        with self._lock:
+            self._terms = terms
+            self._by_id = by_id
+
+    def upsert(self, candidate: Dict[str, Any]):
+        """登记新增或修改的候选人（to_dict结果）"""
+        candidate_id = candidate['id']
+        new_terms = _terms_for(candidate)
+        with self._lock:
+            self._remove_locked(candidate_id)
+            for term, kind in new_terms:
+                bisect.insort(self._terms, (term, kind, candidate_id))
+            self._by_id[candidate_id] = new_terms
+
+    def remove(self, candidate_id: int):
+        """移除已删除的候选人"""
+        with self._lock:
+            self._remove_locked(candidate_id)
+
+    def search(self, query: str) -> List[int]:
+        """
+        搜索候选人
+
+        多个关键词（空格分隔）须同时匹配。结果按匹配类型（姓名、拼音、简介）排序，
+        同类型按候选人ID排序。
+
+        Args:
+            query: 搜索关键词
+
+        Returns:
+            匹配的候选人ID列表
+        """
+        words = query.strip().lower().split()
+        if not words:
+            return []
+
+        best = None
+        with self._lock:
+            for word in words:
+                matches = {}
+                terms = self._terms
+                index = bisect.bisect_left(terms, (word,))
+                while index < len(terms) and terms[index][0].startswith(word):
+                    _, kind, candidate_id = terms[index]
+                    index += 1
+                    if kind < matches.get(candidate_id, MATCH_DESCRIPTION + 1):
+                        matches[candidate_id] = kind
+
+                if best is None:
+                    best = matches
+                else:
+                    best = {
+                        candidate_id: min(kind, matches[candidate_id])
+                        for candidate_id, kind in best.items() if candidate_id in matches
+                    }
+                if not best:
+                    return []
+
+        return [candidate_id for candidate_id, _ in sorted(best.items(), key=lambda item: (item[1], item[0]))]
+
+    def _remove_locked(self, candidate_id: int):
+        """移除候选人的搜索词（调用方需持有锁）"""
+        for term, kind in self._by_id.pop(candidate_id, []):
+            index = bisect.bisect_left(self._terms, (term, kind, candidate_id))
+            if index < len(self._terms) and self._terms[index] == (term, kind, candidate_id):
+                del self._terms[index]
+
+
+# 全局搜索索引实例
+candidate_search = CandidateSearchIndex()
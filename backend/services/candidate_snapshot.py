@@ -0,0 +1,90 @@
+"""
+公开候选人列表快照
+
+所有投票者看到的候选人列表完全相同（不含得票数），按候选人数据版本
+生成一次序列化后的响应体（默认格式和紧凑格式，各自可选gzip压缩版本），
+之后直接发送，不再查询数据库。
+"""
+import gzip
+import threading
+from typing import Optional, Tuple
+from flask import current_app, request
+from backend.models import Candidate
+from backend.utils.data_version import data_versions, TOPIC_CANDIDATES
+from backend.utils.candidate_schema import to_compact
+
+
+class PublicCandidateSnapshot:
+    """公开候选人列表的预序列化响应体"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (数据版本, {是否紧凑格式: (JSON响应体, gzip响应体)})，整体替换以保证版本与内容一致
+        self._snapshot = (None, None)
+
+    def get(self, compact: bool = False) -> Tuple[bytes, Optional[bytes]]:
+        """
+        获取当前数据版本的响应体（需在应用上下文中调用）
+
+        Args:
+            compact: 是否使用紧凑格式
+
+        Returns:
+            (JSON响应体, gzip压缩后的响应体)，未启用压缩或压缩无收益时后者为None
+        """
+        version = data_versions.get(TOPIC_CANDIDATES)
+        snapshot_version, bodies = self._snapshot
+        if snapshot_version == version:
+            return bodies[compact]
+
+        with self._lock:
+            # 等待锁期间其他请求可能已经生成
+            if self._snapshot[0] != version:
+                self._snapshot = (version, self._build())
+            return self._snapshot[1][compact]
+
+    def response(self, compact: bool = False):
+        """生成响应，客户端支持时直接发送gzip版本"""
+        body, gzip_body = self.get(compact)
+        if gzip_body is not None and 'gzip' in request.accept_encodings:
+            response = current_app.response_class(gzip_body, mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = current_app.response_class(body, mimetype='application/json')
+        response.vary.add('Accept-Encoding')
+        return response
+
+    @classmethod
+    def _build(cls):
+        """查询数据库并序列化两种格式"""
+        candidates_data = []
+        for candidate in Candidate.query.order_by(Candidate.id).all():
+            candidate_dict = candidate.to_dict()
+            candidate_dict['votes'] = 0  # 对非管理员隐藏得票数
+            candidates_data.append(candidate_dict)
+
+        return {
+            False: cls._encode(candidates_data),
+            True: cls._encode(to_compact(candidates_data, include_votes=False)),
+        }
+
+    @staticmethod
+    def _encode(data) -> Tuple[bytes, Optional[bytes]]:
+        """序列化为响应体及其gzip版本"""
+        # 与 success_response 的响应结构保持一致
+        body = current_app.json.dumps({
+            'success': True,
+            'message': '操作成功',
+            'data': data
+        }).encode('utf-8') + b'\n'
+
+        gzip_body = None
+        if current_app.config['PUBLIC_CANDIDATES_GZIP']:
+            compressed = gzip.compress(body, compresslevel=6, mtime=0)
+            if len(compressed) < len(body):
+                gzip_body = compressed
+        return body, gzip_body
+
+
+# 全局公开候选人快照实例
+public_candidates = PublicCandidateSnapshot()
@@ -0,0 +1,145 @@
+"""
+抽奖候选池
+
+在内存中维护全部候选人ID数组，前段为未中奖者、后段为已中奖者：
+    [ 未中奖者 ... | 已中奖者 ... ]
+                  ^ eligible_count
+登记中奖、新增或删除候选人时通过交换位置在O(1)内维护分区，
+抽奖时直接在数组前段随机取k个下标（O(k)），只从数据库读取中奖者的记录。
+"""
+import random
+import threading
+from typing import Any, Dict, Iterable, List, Tuple
+from backend.models import db, Candidate, LotteryRecord
+
+
+class LotteryPool:
+    """抽奖候选池"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 抽奖过程（抽取、写入记录、登记中奖）需串行执行，避免并发抽奖抽中同一人
+        self.draw_lock = threading.Lock()
+        self._ids: List[int] = []
+        # 候选人ID -> 在数组中的下标
+        self._positions: Dict[int, int] = {}
+        # 未中奖者数量（数组前段）
+        self._eligible_count = 0
+
+    def load(self):
+        """从数据库加载候选人和已中奖者（需在应用上下文中调用）"""
+        eligible, winners = self._query()
+        with self._lock:
+            self._install(eligible, winners)
+
+    def verify(self) -> Dict[str, Any]:
+        """
+        与数据库核对候选池，不一致时以数据库为准重新加载
+
+        Returns:
+            核对结果，包含是否一致及差异列表
+        """
+        eligible, winners = self._query()
+        differences = []
+
+        with self._lock:
+            pool_eligible = set(self._ids[:self._eligible_count])
+            pool_winners = set(self._ids[self._eligible_count:])
+            if len(pool_eligible) != len(eligible):
+                differences.append(f'可抽奖人数: 候选池{len(pool_eligible)}, 数据库{len(eligible)}')
+            if len(pool_winners) != len(winners):
+                differences.append(f'已中奖人数: 候选池{len(pool_winners)}, 数据库{len(winners)}')
+            mismatched = len(pool_eligible.symmetric_difference(eligible))
+            if mismatched:
+                differences.append(f'可抽奖名单: {mismatched}人不一致')
+            self._install(eligible, winners)
+
+        return {
+            'consistent': not differences,
+            'differences': differences
+        }
+
+    def available_count(self, exclude_winners: bool = True) -> int:
+        """可抽奖人数"""
+        return self._eligible_count if exclude_winners else len(self._ids)
+
+    def sample(self, count: int, exclude_winners: bool = True) -> List[int]:
+        """
+        随机抽取候选人
+
+        Args:
+            count: 抽取人数（不得超过可抽奖人数）
+            exclude_winners: 是否排除已中奖者
+
+        Returns:
+            抽中的候选人ID列表
+        """
+        with self._lock:
+            size = self._eligible_count if exclude_winners else len(self._ids)
+            return [self._ids[index] for index in random.sample(range(size), count)]
+
+    def add(self, candidate_id: int):
+        """登记新增的候选人（未中奖）"""
+        with self._lock:
+            if candidate_id in self._positions:
+                return
+            self._positions[candidate_id] = len(self._ids)
+            self._ids.append(candidate_id)
+            self._swap(len(self._ids) - 1, self._eligible_count)
+            self._eligible_count += 1
+
+    def remove(self, candidate_id: int):
+        """移除已删除的候选人（其中奖记录随之删除）"""
+        with self._lock:
+            if candidate_id not in self._positions:
+                return
+            self._mark_winner(candidate_id)
+            self._swap(self._positions[candidate_id], len(self._ids) - 1)
+            self._ids.pop()
+            del self._positions[candidate_id]
+
+    def record_winners(self, candidate_ids: Iterable[int]):
+        """登记中奖者"""
+        with self._lock:
+            for candidate_id in candidate_ids:
+                if candidate_id in self._positions:
+                    self._mark_winner(candidate_id)
+
+    def reset_winners(self):
+        """清空中奖记录后，所有候选人恢复可抽奖"""
+        with self._lock:
+            self._eligible_count = len(self._ids)
+
+    @staticmethod
+    def _query() -> Tuple[List[int], List[int]]:
+        """查询 (未中奖者ID, 已中奖者ID)，用 NOT EXISTS 反连接区分，不传入ID参数列表"""
+        not_won = LotteryRecord.not_won()
+        eligible = [row[0] for row in db.session.query(Candidate.id).filter(not_won).order_by(Candidate.id)]
+        winners = [row[0] for row in db.session.query(Candidate.id).filter(~not_won).order_by(Candidate.id)]
+        return eligible, winners
+
+    def _install(self, eligible: List[int], winners: List[int]):
+        """替换候选池内容（调用方需持有锁）"""
+        self._ids = eligible + winners
+        self._positions = {cid: index for index, cid in enumerate(self._ids)}
+        self._eligible_count = len(eligible)
+
+    def _mark_winner(self, candidate_id: int):
+        """将候选人移到已中奖区（调用方需持有锁）"""
+        index = self._positions[candidate_id]
+        if index < self._eligible_count:
+            self._eligible_count -= 1
+            self._swap(index, self._eligible_count)
+
+    def _swap(self, i: int, j: int):
+        """交换数组中两个位置（调用方需持有锁）"""
+        if i == j:
+            return
+        ids = self._ids
+        ids[i], ids[j] = ids[j], ids[i]
+        self._positions[ids[i]] = i
+        self._positions[ids[j]] = j
+
+
+# 全局抽奖候选池实例
+lottery_pool = LotteryPool()
@@ -1,9 +1,11 @@
 """
 抽奖服务
 """
-import random
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from backend.models import db, Candidate, LotteryRecord
+from backend.services.lottery_pool import lottery_pool
+from backend.utils.data_version import data_versions, TOPIC_LOTTERY
+from backend.utils.pagination import paginate_query
 
 
 class LotteryService:
@@ -24,47 +26,53 @@ class LotteryService:
             抽奖结果
         """
         try:
-            # 获取候选池
-            query = Candidate.query
-            
-            if exclude_winners:
-                # 获取已中奖者ID
-                winner_ids = LotteryRecord.get_winners_ids()
-                if winner_ids:
-                    query = query.filter(~Candidate.id.in_(winner_ids))
-            
-            candidates = query.all()
-            
-            if len(candidates) == 0:
-                return {
-                    'success': False,
-                    'message': '没有可抽奖的候选人'
-                }
-            
-            if count > len(candidates):
-                return {
-                    'success': False,
-                    'message': f'可抽奖人数不足，当前只有{len(candidates)}人'
-                }
-            
-            # 随机抽取
-            winners = random.sample(candidates, count)
-            
-            # 获取当前轮次
-            current_round = LotteryRecord.get_max_round() + 1
-            
-            # 保存抽奖记录
-            winner_list = []
-            for winner in winners:
-                record = LotteryRecord(
-                    candidate_id=winner.id,
-                    round=current_round,
-                    prize_name=prize_name
-                )
-                db.session.add(record)
-                winner_list.append(winner.to_dict())
-            
-            db.session.commit()
+            with lottery_pool.draw_lock:
+                # 从内存候选池抽取，不加载整个候选人表
+                available = lottery_pool.available_count(exclude_winners)
+                
+                if available == 0:
+                    return {
+                        'success': False,
+                        'message': '没有可抽奖的候选人'
+                    }
+                
+                if count > available:
+                    return {
+                        'success': False,
+                        'message': f'可抽奖人数不足，当前只有{available}人'
+                    }
+                
+                # 随机抽取，只读取中奖者的记录（参数数量等于抽取人数）
+                winner_ids = lottery_pool.sample(count, exclude_winners)
+                query = Candidate.query.filter(Candidate.id.in_(winner_ids))
+                if exclude_winners:
+                    query = query.filter(LotteryRecord.not_won())
+                candidates = {c.id: c for c in query}
+                if len(candidates) != len(winner_ids):
+                    # 候选池与数据库不一致（候选人已被删除或已中奖），重新加载后由管理员重试
+                    lottery_pool.load()
+                    return {
+                        'success': False,
+                        'message': '候选人数据已变化，请重新抽奖'
+                    }
+                
+                # 获取当前轮次
+                current_round = LotteryRecord.get_max_round() + 1
+                
+                # 保存抽奖记录
+                winner_list = []
+                for winner_id in winner_ids:
+                    record = LotteryRecord(
+                        candidate_id=winner_id,
+                        round=current_round,
+                        prize_name=prize_name
+                    )
+                    db.session.add(record)
+                    winner_list.append(candidates[winner_id].to_dict())
+                
+                db.session.commit()
+                lottery_pool.record_winners(winner_ids)
+                data_versions.bump(TOPIC_LOTTERY)
             
             return {
                 'success': True,
@@ -90,7 +98,7 @@ class LotteryService:
             抽奖记录列表
         """
         try:
-            records = LotteryRecord.query.order_by(
+            records = LotteryRecord.query.options(db.joinedload(LotteryRecord.candidate)).order_by(
                 LotteryRecord.round.desc(),
                 LotteryRecord.drawn_at.desc()
             ).all()
@@ -101,6 +109,25 @@ class LotteryService:
             print(f'获取抽奖历史失败: {str(e)}')
             return []
     
+    @staticmethod
+    def get_lottery_history_page(cursor: Optional[list], page_size: int) -> Tuple[List[Dict], Optional[str]]:
+        """
+        分页获取抽奖历史记录（按轮次、抽奖时间倒序）
+        
+        Args:
+            cursor: 上一页游标解析出的排序键
+            page_size: 每页数量
+            
+        Returns:
+            (抽奖记录列表, 下一页游标)
+        """
+        records, next_cursor = paginate_query(
+            LotteryRecord.query.options(db.joinedload(LotteryRecord.candidate)),
+            [(LotteryRecord.round, True), (LotteryRecord.drawn_at, True), (LotteryRecord.id, True)],
+            cursor, page_size
+        )
+        return [r.to_dict() for r in records], next_cursor
+    
     @staticmethod
     def get_lottery_by_round(round_num: int) -> List[Dict]:
         """
@@ -128,8 +155,11 @@ class LotteryService:
             重置结果
         """
         try:
-            LotteryRecord.query.delete()
-            db.session.commit()
+            with lottery_pool.draw_lock:
+                LotteryRecord.query.delete()
+                db.session.commit()
+                lottery_pool.reset_winners()
+            data_versions.bump(TOPIC_LOTTERY)
             
             return {
                 'success': True,
@@ -155,14 +185,7 @@ class LotteryService:
             可抽奖人数
         """
         try:
-            query = Candidate.query
-            
-            if exclude_winners:
-                winner_ids = LotteryRecord.get_winners_ids()
-                if winner_ids:
-                    query = query.filter(~Candidate.id.in_(winner_ids))
-            
-            return query.count()
+            return lottery_pool.available_count(exclude_winners)
             
         except Exception as e:
             print(f'获取可抽奖人数失败: {str(e)}')
@@ -0,0 +1,196 @@
+"""
+投票结果事件流（SSE）
+
+大屏和不便使用Socket.IO的浏览器通过 Server-Sent Events 接收投票结果：
+连接时先收到完整结果快照，之后收到票数增量。每条事件只序列化一次，
+保存在环形缓冲区中供所有订阅者共享；断线重连时按 Last-Event-ID 补发错过的事件，
+缓冲区已覆盖不到时改发最新快照。
+"""
+import json
+import threading
+from collections import deque
+from typing import Any, Dict, Iterator, Optional, Tuple
+from backend.services.vote_stats import vote_stats
+from backend.utils.data_version import data_versions, TOPIC_CANDIDATES, TOPIC_VOTES
+
+
+class _Subscription:
+    """
+    单个订阅者的事件流
+
+    订阅名额在 close() 或事件流结束时释放。响应体未被迭代就关闭时
+    （如HEAD请求）生成器的 finally 不会执行，因此不能只依赖生成器释放。
+    """
+
+    def __init__(self, stream: 'ResultStream', cursor: Optional[int]):
+        self._stream = stream
+        self._released = False
+        self._frames = stream._stream(cursor, self._release)
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self._frames
+
+    def close(self):
+        """关闭事件流并释放订阅名额"""
+        self._frames.close()
+        self._release()
+
+    def _release(self):
+        """释放订阅名额（只生效一次）"""
+        with self._stream._cond:
+            if self._released:
+                return
+            self._released = True
+            self._stream._subscribers -= 1
+
+
+class ResultStream:
+    """结果事件的共享缓冲区与订阅者分发"""
+
+    def __init__(self, buffer_size: int = 256, heartbeat: float = 15, max_subscribers: int = 50):
+        self.heartbeat = heartbeat
+        self.max_subscribers = max_subscribers
+        self._cond = threading.Condition()
+        # (序号, 已编码的事件)，按序号升序
+        self._events: deque = deque(maxlen=buffer_size)
+        self._seq = 0
+        self._subscribers = 0
+        # 最近生成的快照：(数据版本, 序号, 已编码的事件)
+        self._snapshot: Tuple[Any, int, Optional[bytes]] = (None, 0, None)
+        self._candidates_version = None
+
+    @property
+    def subscribers(self) -> int:
+        """当前订阅者数量"""
+        return self._subscribers
+
+    def configure(self, buffer_size: int, heartbeat: float, max_subscribers: int):
+        """根据应用配置设置缓冲区大小、心跳间隔和订阅者上限"""
+        with self._cond:
+            self._events = deque(self._events, maxlen=buffer_size)
+            self.heartbeat = heartbeat
+            self.max_subscribers = max_subscribers
+            self._candidates_version = data_versions.get(TOPIC_CANDIDATES)
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        """
+        发布事件（序列化一次，所有订阅者共享）
+
+        Args:
+            event: 事件名称
+            data: 事件数据
+        """
+        payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        with self._cond:
+            self._seq += 1
+            self._events.append((self._seq, self._encode(self._seq, event, payload)))
+            self._cond.notify_all()
+
+    def publish_delta(self, votes: Dict[int, int]):
+        """发布票数增量 {候选人ID: 最新票数}"""
+        self.publish('delta', {'votes': votes})
+
+    def publish_snapshot(self):
+        """发布完整结果快照（投票重置后调用）"""
+        self._candidates_version = data_versions.get(TOPIC_CANDIDATES)
+        self.publish('snapshot', self._snapshot_data())
+
+    def refresh(self):
+        """候选人有增删改时发布完整快照（由广播器定期调用）"""
+        if self._subscribers and data_versions.get(TOPIC_CANDIDATES) != self._candidates_version:
+            self.publish_snapshot()
+
+    def open(self, last_event_id: Optional[str] = None) -> Optional[Iterator[bytes]]:
+        """
+        订阅事件流
+
+        Args:
+            last_event_id: 客户端重连时携带的 Last-Event-ID
+
+        Returns:
+            事件流（可迭代，关闭时释放订阅名额），订阅者已满时返回None
+        """
+        with self._cond:
+            if self._subscribers >= self.max_subscribers:
+                return None
+            self._subscribers += 1
+        return _Subscription(self, self._parse_event_id(last_event_id))
+
+    def _stream(self, cursor: Optional[int], release) -> Iterator[bytes]:
+        """单个订阅者的事件流生成器，结束时调用release释放名额"""
+        try:
+            yield b'retry: 3000\n\n'
+            if cursor is None:
+                cursor, frame = self._current_snapshot()
+                yield frame
+
+            while True:
+                with self._cond:
+                    frames, cursor, missed = self._events_after(cursor)
+                    if not frames and not missed:
+                        self._cond.wait(self.heartbeat)
+                        frames, cursor, missed = self._events_after(cursor)
+
+                if missed:
+                    # 落后超过缓冲区，改发最新快照
+                    cursor, frame = self._current_snapshot()
+                    yield frame
+                elif frames:
+                    yield b''.join(frames)
+                else:
+                    yield b': ping\n\n'
+        finally:
+            release()
+
+    def _events_after(self, cursor: int):
+        """取出序号大于cursor的事件（调用方需持有锁）"""
+        events = self._events
+        if not events or events[-1][0] <= cursor:
+            return [], cursor, False
+        if events[0][0] > cursor + 1:
+            return [], cursor, True
+        frames = [frame for seq, frame in events if seq > cursor]
+        return frames, events[-1][0], False
+
+    def _current_snapshot(self) -> Tuple[int, bytes]:
+        """当前结果快照，数据未变化时复用已编码的快照"""
+        version = data_versions.get(TOPIC_CANDIDATES, TOPIC_VOTES)
+        with self._cond:
+            snapshot_version, seq, frame = self._snapshot
+            if snapshot_version == version and frame is not None:
+                return seq, frame
+            seq = self._seq
+
+        payload = json.dumps(self._snapshot_data(), ensure_ascii=False, separators=(',', ':'))
+        frame = self._encode(seq, 'snapshot', payload)
+        with self._cond:
+            self._snapshot = (version, seq, frame)
+        return seq, frame
+
+    @staticmethod
+    def _snapshot_data() -> Dict[str, Any]:
+        """完整结果（与公开统计接口内容一致）"""
+        stats = vote_stats.get()
+        return {
+            'total_votes': stats['total_votes'],
+            'candidates': stats['candidates']
+        }
+
+    @staticmethod
+    def _encode(seq: int, event: str, payload: str) -> bytes:
+        """编码为SSE事件，事件ID带进程标识，服务重启后旧ID不会误匹配"""
+        return f'id: {data_versions.epoch}-{seq}\nevent: {event}\ndata: {payload}\n\n'.encode('utf-8')
+
+    def _parse_event_id(self, last_event_id: Optional[str]) -> Optional[int]:
+        """解析 Last-Event-ID，无效或来自其他进程时返回None"""
+        if not last_event_id:
+            return None
+        epoch, _, seq = last_event_id.partition('-')
+        if epoch != data_versions.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        return seq if seq <= self._seq else None
+
+
+# 全局结果事件流实例
+result_stream = ResultStream()
@@ -0,0 +1,103 @@
+"""
+投票更新广播服务
+
+投票请求只登记票数发生变化的候选人，由后台任务按固定间隔
+合并成一条 {候选人ID: 票数} 的增量消息广播，投票请求本身不再承担广播开销。
+"""
+import threading
+import time
+from typing import Set
+from backend.models import db, Candidate
+from backend.services.vote_timeline import vote_timeline
+from backend.services.result_stream import result_stream
+
+
+class VoteBroadcaster:
+    """合并式投票增量广播器"""
+
+    def __init__(self):
+        self.app = None
+        self.running = False
+        self.interval = 0.25
+        self.notify_interval = 5.0
+        self._last_notify = 0.0
+        self._lock = threading.Lock()
+        self._changed: Set[int] = set()
+
+    def start(self, app):
+        """
+        启动广播后台任务
+
+        Args:
+            app: Flask应用实例
+        """
+        if self.running:
+            return
+
+        from backend.app import socketio
+        self.app = app
+        self.interval = app.config['VOTE_BROADCAST_INTERVAL_MS'] / 1000.0
+        self.notify_interval = app.config['VOTE_RESULTS_NOTIFY_INTERVAL']
+        self.running = True
+        socketio.start_background_task(self._run)
+
+    def stop(self):
+        """停止广播后台任务"""
+        self.running = False
+
+    def mark(self, candidate_id: int):
+        """登记票数发生变化的候选人"""
+        with self._lock:
+            self._changed.add(candidate_id)
+
+    def _run(self):
+        """后台任务主循环"""
+        from backend.app import socketio
+        while self.running:
+            socketio.sleep(self.interval)
+            try:
+                with self.app.app_context():
+                    self.flush()
+            except Exception as e:
+                print(f'广播投票更新失败: {str(e)}')
+
+    def flush(self):
+        """广播本周期内的票数增量（需在应用上下文中调用）"""
+        buckets = vote_timeline.take_updates()
+        if buckets:
+            from backend.app import broadcast_vote_timeline
+            broadcast_vote_timeline(buckets)
+        result_stream.refresh()
+
+        with self._lock:
+            if not self._changed:
+                return
+            changed, self._changed = self._changed, set()
+
+        from backend.app import broadcast_vote_delta, broadcast_results_changed
+        try:
+            rows = db.session.query(Candidate.id, Candidate.votes).filter(
+                Candidate.id.in_(changed)
+            ).all()
+        except Exception:
+            # 查询失败时保留待广播记录，下个周期重试
+            with self._lock:
+                self._changed |= changed
+            raise
+        finally:
+            db.session.remove()
+
+        if rows:
+            votes = {candidate_id: votes for candidate_id, votes in rows}
+            broadcast_vote_delta(votes)
+            result_stream.publish_delta(votes)
+
+            # 投票者人数最多，结果变化通知按更长的间隔合并发送
+            now = time.monotonic()
+            if now - self._last_notify >= self.notify_interval:
+                self._last_notify = now
+                broadcast_results_changed()
+
+
+# 全局广播器实例
+vote_broadcaster = VoteBroadcaster()
@@ -1,10 +1,21 @@
 """
 投票业务服务
 """
-from typing import Dict, List, Optional, Any
-from backend.models import db, Candidate, Vote, VoteConfig
-from flask import request
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Any, Tuple
+from backend.models import db, Candidate, Vote
+from flask import request, current_app
+from sqlalchemy.exc import IntegrityError
 from backend.app import broadcast_vote_update
+from backend.services.voter_ledger import voter_ledger, ADMIT_DUPLICATE, ADMIT_QUOTA
+from backend.services.vote_writer import vote_writer
+from backend.services.vote_broadcaster import vote_broadcaster
+from backend.services.vote_stats import vote_stats
+from backend.services.vote_timeline import vote_timeline
+from backend.services.result_stream import result_stream
+from backend.utils.idempotency import vote_idempotency
+from backend.utils.data_version import data_versions, TOPIC_VOTES
+from backend.utils.pagination import paginate_query
 
 
 class VoteService:
@@ -26,69 +37,81 @@ class VoteService:
             投票结果
         """
         try:
-            # 检查候选人是否存在
-            candidate = Candidate.query.get(candidate_id)
-            if not candidate:
-                return {
-                    'success': False,
-                    'message': '候选人不存在'
-                }
+            # 检查投票资格并预占额度（内存账本，不访问数据库）
+            admit, user_vote_count = voter_ledger.reserve(ip, fingerprint, candidate_id)
+            max_votes = voter_ledger.max_votes
             
-            # 检查用户是否已经给该候选人投过票
-            existing_vote_query = Vote.query.filter_by(
-                candidate_id=candidate_id,
-                voter_ip=ip
-            )
-            if fingerprint:
-                existing_vote_query = existing_vote_query.filter_by(device_fingerprint=fingerprint)
-            
-            existing_vote = existing_vote_query.first()
-            if existing_vote:
+            if admit == ADMIT_DUPLICATE:
                 return {
                     'success': False,
                     'message': '您已经给该候选人投过票了，不能重复投票'
                 }
             
-            # 获取投票配置
-            config = VoteConfig.get_config()
-            max_votes = config.max_votes_per_user
-            
-            # 检查已投票次数
-            user_vote_count = Vote.get_vote_count_by_ip(ip, fingerprint)
-            
-            if user_vote_count >= max_votes:
+            if admit == ADMIT_QUOTA:
                 return {
                     'success': False,
                     'message': f'您已经投了{user_vote_count}票，最多只能投{max_votes}票'
                 }
             
-            # 创建投票记录
-            vote = Vote(
-                candidate_id=candidate_id,
-                voter_ip=ip,
-                device_fingerprint=fingerprint,
-                user_agent=user_agent
-            )
-            
-            # 更新候选人票数
-            candidate.votes += 1
+            if vote_writer.running:
+                # 组提交：交给写入线程批量提交，等待所在批次落盘
+                future = vote_writer.submit(candidate_id, ip, fingerprint, user_agent, max_votes)
+                
+                def after_write(f):
+                    # 在批次提交后执行（写入线程中），请求等待超时也不会遗漏
+                    if f.exception() is not None or f.result() is None:
+                        voter_ledger.release(ip, fingerprint, candidate_id)
+                    else:
+                        VoteService._after_commit({candidate_id: f.result()})
+                
+                future.add_done_callback(after_write)
+                try:
+                    new_votes = future.result(timeout=current_app.config['VOTE_WRITER_TIMEOUT'])
+                except FutureTimeoutError:
+                    # 投票仍在写入队列中，提交后会正常计票
+                    return {
+                        'success': True,
+                        'pending': True,
+                        'message': '投票已提交，正在处理中，请稍后刷新查看投票结果',
+                        'user_vote_count': user_vote_count + 1,
+                        'max_votes': max_votes
+                    }
+                admitted = new_votes is not None
+            else:
+                try:
+                    # 在同一事务中原子地写入投票记录并增加票数
+                    admitted = Vote.admit(candidate_id, ip, fingerprint, user_agent, max_votes)
+                    if admitted:
+                        Candidate.increment_votes(candidate_id)
+                        db.session.commit()
+                        VoteService._after_commit({
+                            candidate_id: db.session.get(Candidate, candidate_id).votes
+                        })
+                    else:
+                        db.session.rollback()
+                except IntegrityError:
+                    # 唯一索引拦截了并发的重复投票
+                    db.session.rollback()
+                    admitted = False
+                except Exception:
+                    # 提交失败，撤销预占的额度
+                    voter_ledger.release(ip, fingerprint, candidate_id)
+                    raise
+                if not admitted:
+                    voter_ledger.release(ip, fingerprint, candidate_id)
             
-            db.session.add(vote)
-            db.session.commit()
+            if not admitted:
+                return {
+                    'success': False,
+                    'message': VoteService._rejection_message(candidate_id, ip, fingerprint, max_votes)
+                }
             
-            # 广播投票更新事件
-            candidates = Candidate.query.order_by(Candidate.id).all()
-            candidate_data = {
-                'candidates': [c.to_dict() for c in candidates],
-                'user_vote_count': user_vote_count + 1,
-                'max_votes': max_votes
-            }
-            broadcast_vote_update(candidate_data)
+            candidate = db.session.get(Candidate, candidate_id).to_dict()
             
             return {
                 'success': True,
                 'message': f'投票成功！您已投{user_vote_count + 1}/{max_votes}票',
-                'candidate': candidate.to_dict(),
+                'candidate': candidate,
                 'user_vote_count': user_vote_count + 1,
                 'max_votes': max_votes
             }
@@ -101,59 +124,137 @@ class VoteService:
             }
     
     @staticmethod
-    def get_vote_statistics() -> Dict[str, Any]:
+    def submit_ballot(candidate_ids: List[int], ip: str, fingerprint: Optional[str] = None,
+                      user_agent: Optional[str] = None) -> Dict[str, Any]:
         """
-        获取投票统计数据
+        一次提交多个候选人的选票
+        
+        整张选票只检查一次额度，在一个事务中写入全部投票，
+        要么全部成功，要么全部不生效。
         
+        Args:
+            candidate_ids: 候选人ID列表
+            ip: 投票者IP
+            fingerprint: 设备指纹
+            user_agent: 用户代理
+            
         Returns:
-            统计数据
+            投票结果
         """
+        if len(set(candidate_ids)) != len(candidate_ids):
+            return {
+                'success': False,
+                'message': '选票中包含重复的候选人'
+            }
+        
         try:
-            # 总投票数
-            total_votes = Vote.query.count()
-            
-            # 总候选人数
-            total_candidates = Candidate.query.count()
-            
-            # 获取所有候选人及其票数
-            candidates = Candidate.query.order_by(Candidate.votes.desc()).all()
-            candidate_list = [c.to_dict() for c in candidates]
+            # 整张选票一次检查并预占额度（内存账本，不访问数据库）
+            admit, user_vote_count = voter_ledger.reserve_ballot(ip, fingerprint, candidate_ids)
+            max_votes = voter_ledger.max_votes
             
-            # 获取票数最高的候选人
-            top_candidate = candidates[0] if candidates else None
+            if admit == ADMIT_DUPLICATE:
+                return {
+                    'success': False,
+                    'message': '选票中有您已经投过票的候选人，不能重复投票'
+                }
             
-            # 计算平均每人投票数
-            avg_votes_per_candidate = round(total_votes / total_candidates, 1) if total_candidates > 0 else 0
+            if admit == ADMIT_QUOTA:
+                return {
+                    'success': False,
+                    'message': f'您已经投了{user_vote_count}票，最多只能投{max_votes}票，'
+                               f'本次最多还能选{max(max_votes - user_vote_count, 0)}人'
+                }
             
-            # 获取投票配置
-            from backend.models.vote_config import VoteConfig
-            config = VoteConfig.get_config()
-            max_votes_per_user = config.max_votes_per_user if config else 1
+            rejected_id = None
+            try:
+                # 在一个事务中写入整张选票
+                for candidate_id in candidate_ids:
+                    if not Vote.admit(candidate_id, ip, fingerprint, user_agent, max_votes):
+                        rejected_id = candidate_id
+                        break
+                    Candidate.increment_votes(candidate_id)
+                
+                if rejected_id is None:
+                    db.session.commit()
+                    candidates = [
+                        c.to_dict() for c in Candidate.query.filter(Candidate.id.in_(candidate_ids)).all()
+                    ]
+                    VoteService._after_commit({c['id']: c['votes'] for c in candidates})
+                else:
+                    db.session.rollback()
+            except Exception:
+                db.session.rollback()
+                rejected_id = None
+                for candidate_id in candidate_ids:
+                    voter_ledger.release(ip, fingerprint, candidate_id)
+                raise
             
-            # 计算投票完成率（基于总投票数和最大可能投票数）
-            # 假设有100个用户参与投票
-            estimated_users = 100
-            max_possible_votes = estimated_users * max_votes_per_user
-            vote_completion_rate = round((total_votes / max_possible_votes) * 100, 1) if max_possible_votes > 0 else 0
+            if rejected_id is not None:
+                for candidate_id in candidate_ids:
+                    voter_ledger.release(ip, fingerprint, candidate_id)
+                return {
+                    'success': False,
+                    'message': VoteService._rejection_message(rejected_id, ip, fingerprint, max_votes)
+                }
             
-            # 获取投票记录统计
-            # 简化统计查询，避免复杂的SQL查询
-            total_votes = Vote.query.count()
-            # 获取唯一投票者数量的近似值
-            unique_voters = total_votes  # 简化处理，实际应用中可能需要更精确的统计
+            user_vote_count += len(candidate_ids)
             
             return {
                 'success': True,
-                'total_votes': total_votes,
-                'total_candidates': total_candidates,
-                'unique_voters': unique_voters,
-                'avg_votes_per_candidate': avg_votes_per_candidate,
-                'vote_completion_rate': vote_completion_rate,
-                'max_votes_per_user': max_votes_per_user,
-                'candidates': candidate_list,
-                'top_candidate': top_candidate.to_dict() if top_candidate else None
+                'message': f'投票成功！您已投{user_vote_count}/{max_votes}票',
+                'candidates': candidates,
+                'user_vote_count': user_vote_count,
+                'max_votes': max_votes
             }
             
+        except Exception as e:
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': f'投票失败: {str(e)}'
+            }
+    
+    @staticmethod
+    def _after_commit(votes: Dict[int, int]):
+        """
+        投票提交后更新广播、统计快照、时间序列和数据版本
+        
+        Args:
+            votes: {候选人ID: 提交后的票数}，每个候选人一票
+        """
+        # 登记票数变化，由广播器合并后异步推送
+        for candidate_id in votes:
+            vote_broadcaster.mark(candidate_id)
+        vote_stats.record_votes(votes)
+        vote_timeline.record(list(votes))
+        data_versions.bump(TOPIC_VOTES)
+    
+    @staticmethod
+    def _rejection_message(candidate_id: int, ip: str, fingerprint: Optional[str],
+                           max_votes: int) -> str:
+        """数据库拒绝写入时，查询具体原因（仅在极少数情况下发生）"""
+        if db.session.get(Candidate, candidate_id) is None:
+            return '候选人不存在'
+        
+        query = Vote.query.filter_by(candidate_id=candidate_id, voter_ip=ip)
+        if fingerprint:
+            query = query.filter_by(device_fingerprint=fingerprint)
+        if query.first() is not None:
+            return '您已经给该候选人投过票了，不能重复投票'
+        
+        user_vote_count = Vote.get_vote_count_by_ip(ip, fingerprint)
+        return f'您已经投了{user_vote_count}票，最多只能投{max_votes}票'
+    
+    @staticmethod
+    def get_vote_statistics() -> Dict[str, Any]:
+        """
+        获取投票统计数据（读取内存中的统计快照）
+        
+        Returns:
+            统计数据
+        """
+        try:
+            return vote_stats.get()
         except Exception as e:
             return {
                 'success': False,
@@ -178,6 +279,12 @@ class VoteService:
             Vote.query.delete()
             
             db.session.commit()
+            voter_ledger.clear()
+            vote_idempotency.clear()
+            vote_stats.rebuild()
+            vote_timeline.clear()
+            data_versions.bump(TOPIC_VOTES)
+            result_stream.publish_snapshot()
             
             # 广播投票重置事件
             candidates = Candidate.query.order_by(Candidate.id).all()
@@ -210,8 +317,29 @@ class VoteService:
             投票记录列表
         """
         try:
-            votes = Vote.query.order_by(Vote.voted_at.desc()).limit(limit).all()
+            votes = Vote.query.options(db.joinedload(Vote.candidate)).order_by(
+                Vote.voted_at.desc()
+            ).limit(limit).all()
             return [v.to_dict() for v in votes]
         except Exception as e:
             print(f'获取投票记录失败: {str(e)}')
             return []
+    
+    @staticmethod
+    def get_recent_votes_page(cursor: Optional[list], page_size: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        分页获取投票记录（按投票时间倒序）
+        
+        Args:
+            cursor: 上一页游标解析出的排序键
+            page_size: 每页数量
+            
+        Returns:
+            (投票记录列表, 下一页游标)
+        """
+        votes, next_cursor = paginate_query(
+            Vote.query.options(db.joinedload(Vote.candidate)),
+            [(Vote.voted_at, True), (Vote.id, True)],
+            cursor, page_size
+        )
+        return [v.to_dict() for v in votes], next_cursor
@@ -0,0 +1,208 @@
+"""
+投票统计快照
+
+在内存中维护统计数据：投票提交、重置和候选人变更时增量更新，
+统计接口直接读取已生成的结果，无需访问数据库。
+公开统计接口的响应体按 (每人票数, 是否紧凑格式) 序列化一次并缓存（含压缩版本），
+数据变化前的请求直接发送缓存的字节。
+"""
+import threading
+from typing import Any, Dict, Optional, Tuple
+from flask import current_app
+from backend.models import db, Candidate, Vote
+from backend.services.voter_ledger import voter_ledger
+from backend.utils.candidate_schema import to_compact
+from backend.utils.compression import compress, negotiate_encoding
+
+
+class VoteStatistics:
+    """投票统计快照"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 候选人ID -> 候选人数据（to_dict结果）
+        self._candidates: Dict[int, Dict[str, Any]] = {}
+        self._total_votes = 0
+        self._expected_audience = 100
+        # 已生成的统计结果及生成时的每人票数，数据变化后置空
+        self._payload: Optional[Dict[str, Any]] = None
+        self._payload_max_votes = None
+        # 公开统计响应体：(每人票数, 是否紧凑格式) -> {压缩方式: 响应体}，None为未压缩
+        self._bodies: Dict[Tuple[int, bool], Dict[Optional[str], bytes]] = {}
+
+    def configure(self, expected_audience: int):
+        """根据应用配置设置预计到场人数"""
+        with self._lock:
+            self._expected_audience = expected_audience
+            self._invalidate()
+
+    def rebuild(self):
+        """从数据库重建快照（需在应用上下文中调用）"""
+        candidates, total_votes = self._load()
+        with self._lock:
+            self._candidates = candidates
+            self._total_votes = total_votes
+            self._invalidate()
+
+    def verify(self) -> Dict[str, Any]:
+        """
+        与数据库核对快照，不一致时以数据库为准重建
+
+        Returns:
+            核对结果，包含是否一致及差异列表
+        """
+        candidates, total_votes = self._load()
+        differences = []
+
+        # 投票者数量由账本维护，与数据库不一致时重新加载账本
+        unique_voters = Vote.count_unique_voters()
+        if voter_ledger.voter_count != unique_voters:
+            differences.append(f'投票人数: 快照{voter_ledger.voter_count}, 数据库{unique_voters}')
+            voter_ledger.load()
+
+        with self._lock:
+            if self._total_votes != total_votes:
+                differences.append(f'总票数: 快照{self._total_votes}, 数据库{total_votes}')
+            for candidate_id in sorted(set(self._candidates) | set(candidates)):
+                cached = self._candidates.get(candidate_id)
+                actual = candidates.get(candidate_id)
+                if cached is None:
+                    differences.append(f'候选人{candidate_id}: 快照中缺失')
+                elif actual is None:
+                    differences.append(f'候选人{candidate_id}: 数据库中已不存在')
+                elif cached != actual:
+                    differences.append(
+                        f'候选人{candidate_id}: 快照{cached["votes"]}票, 数据库{actual["votes"]}票'
+                    )
+
+            self._candidates = candidates
+            self._total_votes = total_votes
+            self._invalidate()
+
+        return {
+            'consistent': not differences,
+            'differences': differences
+        }
+
+    def record_votes(self, votes: Dict[int, int]):
+        """
+        登记已提交的投票（每个候选人一票）
+
+        Args:
+            votes: {候选人ID: 投票后的票数}
+        """
+        with self._lock:
+            for candidate_id, count in votes.items():
+                cached = self._candidates.get(candidate_id)
+                # 并发提交可能乱序到达，票数只增不减
+                if cached is not None and count >= cached['votes']:
+                    self._candidates[candidate_id] = dict(cached, votes=count)
+                self._total_votes += 1
+            self._invalidate()
+
+    def update_candidate(self, candidate: Dict[str, Any]):
+        """登记新增或修改的候选人"""
+        with self._lock:
+            self._candidates[candidate['id']] = candidate
+            self._invalidate()
+
+    def get(self) -> Dict[str, Any]:
+        """获取统计结果（数据未变化时直接返回上次生成的结果）"""
+        max_votes = voter_ledger.max_votes
+        with self._lock:
+            if self._payload is None or self._payload_max_votes != max_votes:
+                self._payload = self._build(max_votes)
+                self._payload_max_votes = max_votes
+                self._bodies = {}
+            return self._payload
+
+    def response(self, compact: bool = False):
+        """
+        生成公开统计接口的响应（需在请求上下文中调用）
+
+        只包含总票数和候选人列表，结构与 success_response 一致；
+        客户端支持压缩时直接发送缓存的压缩版本。
+
+        Args:
+            compact: 是否使用紧凑格式
+        """
+        payload = self.get()
+        key = (payload['max_votes_per_user'], compact)
+        variants = self._bodies.get(key)
+        if variants is None:
+            body = current_app.json.dumps({
+                'success': True,
+                'message': '操作成功',
+                'data': {
+                    'total_votes': payload['total_votes'],
+                    'candidates': to_compact(payload['candidates']) if compact else payload['candidates']
+                }
+            }).encode('utf-8') + b'\n'
+            variants = {None: body}
+            with self._lock:
+                # 序列化期间数据已变化时不缓存，避免旧数据覆盖新数据
+                if self._payload is payload:
+                    self._bodies[key] = variants
+
+        encoding = None
+        if (current_app.config['COMPRESSION_ENABLED']
+                and len(variants[None]) >= current_app.config['COMPRESSION_MIN_SIZE']):
+            encoding = negotiate_encoding()
+            if encoding is not None and encoding not in variants:
+                variants[encoding] = compress(variants[None], encoding)
+
+        response = current_app.response_class(variants[encoding], mimetype='application/json')
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def _invalidate(self):
+        """数据变化后丢弃已生成的结果和响应体（调用方需持有锁）"""
+        self._payload = None
+        self._bodies = {}
+
+    @staticmethod
+    def _load():
+        """从数据库读取候选人和总票数"""
+        candidates = {c.id: c.to_dict() for c in Candidate.query.all()}
+        total_votes = db.session.query(db.func.count(Vote.id)).scalar() or 0
+        return candidates, total_votes
+
+    def _build(self, max_votes_per_user: int) -> Dict[str, Any]:
+        """生成统计结果（调用方需持有锁）"""
+        total_votes = self._total_votes
+        candidate_list = sorted(self._candidates.values(), key=lambda c: (-c['votes'], c['id']))
+        total_candidates = len(candidate_list)
+
+        # 计算平均每人投票数
+        avg_votes_per_candidate = round(total_votes / total_candidates, 1) if total_candidates > 0 else 0
+
+        # 不同投票者（IP + 设备指纹）数量，由投票者账本精确维护
+        unique_voters = voter_ledger.voter_count
+        expected_audience = self._expected_audience
+
+        # 计算投票完成率（基于总投票数和预计到场人数的最大可能投票数）
+        max_possible_votes = expected_audience * max_votes_per_user
+        vote_completion_rate = round((total_votes / max_possible_votes) * 100, 1) if max_possible_votes > 0 else 0
+
+        # 计算参与率（已投票人数占预计到场人数的比例）
+        participation_rate = round((unique_voters / expected_audience) * 100, 1) if expected_audience > 0 else 0
+
+        return {
+            'success': True,
+            'total_votes': total_votes,
+            'total_candidates': total_candidates,
+            'unique_voters': unique_voters,
+            'avg_votes_per_candidate': avg_votes_per_candidate,
+            'vote_completion_rate': vote_completion_rate,
+            'participation_rate': participation_rate,
+            'expected_audience': expected_audience,
+            'max_votes_per_user': max_votes_per_user,
+            'candidates': candidate_list,
+            'top_candidate': candidate_list[0] if candidate_list else None
+        }
+
+
+# 全局统计快照实例
+vote_stats = VoteStatistics()
@@ -0,0 +1,178 @@
+"""
+投票时间序列
+
+按固定时长（默认每分钟）分桶统计各候选人得票数，保存在环形缓冲区中，
+供管理端绘制票数随时间变化的曲线。投票提交时增量更新，启动时从数据库回填。
+"""
+import calendar
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+from backend.models import db, Vote
+
+
+def _candidate_ids(values: Iterable[Any]) -> List[int]:
+    """将候选人ID统一为整数，跳过无法转换的值（桶内以整数为键，"1" 与 1 须计入同一候选人）"""
+    result = []
+    for value in values:
+        if isinstance(value, (bool, float)):
+            continue
+        try:
+            result.append(int(value))
+        except (TypeError, ValueError):
+            continue
+    return result
+
+
+class VoteTimeline:
+    """按时间分桶的投票计数环形缓冲区"""
+
+    def __init__(self, bucket_seconds: int = 60, max_buckets: int = 240):
+        self.bucket_seconds = bucket_seconds
+        self.max_buckets = max_buckets
+        self._lock = threading.Lock()
+        # (桶起始时间戳, 候选人ID -> 票数)，按时间升序；没有投票的桶不占空间
+        self._buckets: deque = deque()
+        # 上次推送后发生变化的桶
+        self._updated = set()
+
+    def configure(self, bucket_seconds: int, max_buckets: int):
+        """根据应用配置设置分桶时长和保留桶数"""
+        with self._lock:
+            self.bucket_seconds = bucket_seconds
+            self.max_buckets = max_buckets
+            self._buckets = deque()
+            self._updated = set()
+
+    def load(self):
+        """从数据库回填保留窗口内的投票（需在应用上下文中调用）"""
+        window = timedelta(seconds=self.bucket_seconds * self.max_buckets)
+        rows = db.session.query(Vote.candidate_id, Vote.voted_at).filter(
+            Vote.voted_at >= datetime.utcnow() - window
+        ).all()
+
+        with self._lock:
+            self._buckets = deque()
+            self._updated = set()
+            # voted_at 为UTC时间
+            for candidate_id, voted_at in sorted(rows, key=lambda row: row[1]):
+                bucket = self._bucket(self._bucket_start(calendar.timegm(voted_at.utctimetuple())))
+                if bucket is not None:
+                    bucket[candidate_id] += 1
+
+    def clear(self):
+        """清空所有计数（投票重置后调用）"""
+        with self._lock:
+            self._buckets = deque()
+            self._updated = set()
+
+    def record(self, candidate_ids: Iterable[int], timestamp: Optional[float] = None):
+        """
+        登记已提交的投票
+
+        Args:
+            candidate_ids: 得票的候选人ID（每个一票），非整数ID会转换为整数，无法转换的忽略
+            timestamp: 投票时间戳，默认为当前时间
+        """
+        candidate_ids = _candidate_ids(candidate_ids)
+        start = self._bucket_start(time.time() if timestamp is None else timestamp)
+        with self._lock:
+            bucket = self._bucket(start)
+            if bucket is None:
+                return
+            for candidate_id in candidate_ids:
+                bucket[candidate_id] += 1
+            self._updated.add(start)
+
+    def take_updates(self) -> List[Dict[str, Any]]:
+        """取出上次调用后发生变化的桶（完整计数，客户端直接覆盖）"""
+        with self._lock:
+            if not self._updated:
+                return []
+            updated, self._updated = self._updated, set()
+            return [
+                {'t': start, 'counts': dict(counts)}
+                for start, counts in self._buckets if start in updated
+            ]
+
+    def get_series(self, candidate_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        获取列式时间序列
+
+        Args:
+            candidate_ids: 只返回这些候选人，默认返回窗口内有得票的全部候选人
+
+        Returns:
+            timestamps 为各桶起始时间戳（秒），counts[i][j] 为
+            candidate_ids[i] 在 timestamps[j] 所在桶内的得票数
+        """
+        now = self._bucket_start(time.time())
+        with self._lock:
+            bucket_seconds = self.bucket_seconds
+            # 停止投票后不会再追加新桶，读取时按当前时间淘汰超出保留窗口的旧桶
+            oldest = now - bucket_seconds * (self.max_buckets - 1)
+            self._evict(oldest)
+            buckets = [(start, dict(counts)) for start, counts in self._buckets]
+
+        if candidate_ids is None:
+            candidate_ids = sorted({cid for _, counts in buckets for cid in counts})
+        else:
+            candidate_ids = _candidate_ids(candidate_ids)
+
+        # 补齐没有投票的桶，时间轴连续到当前桶，最多 max_buckets 个
+        first = buckets[0][0] if buckets else now
+        timestamps = list(range(first, max(now, buckets[-1][0] if buckets else now) + 1, bucket_seconds))
+        index = {start: i for i, start in enumerate(timestamps)}
+
+        counts = [[0] * len(timestamps) for _ in candidate_ids]
+        rows = {cid: row for cid, row in zip(candidate_ids, counts)}
+        for start, bucket in buckets:
+            column = index[start]
+            for cid, count in bucket.items():
+                row = rows.get(cid)
+                if row is not None:
+                    row[column] = count
+
+        return {
+            'bucket_seconds': bucket_seconds,
+            'timestamps': timestamps,
+            'candidate_ids': candidate_ids,
+            'counts': counts
+        }
+
+    def _bucket_start(self, timestamp: float) -> int:
+        """时间戳所在桶的起始时间"""
+        return int(timestamp // self.bucket_seconds) * self.bucket_seconds
+
+    def _evict(self, oldest: int):
+        """淘汰起始时间早于 oldest 的桶（调用方需持有锁）"""
+        buckets = self._buckets
+        while buckets and buckets[0][0] < oldest:
+            self._updated.discard(buckets.popleft()[0])
+
+    def _bucket(self, start: int) -> Optional[Counter]:
+        """获取或创建桶，超出保留窗口的旧桶返回None（调用方需持有锁）"""
+        buckets = self._buckets
+        if not buckets or start > buckets[-1][0]:
+            buckets.append((start, Counter()))
+            self._evict(start - self.bucket_seconds * (self.max_buckets - 1))
+            return buckets[-1][1]
+
+        if start < buckets[-1][0] - self.bucket_seconds * (self.max_buckets - 1):
+            return None
+
+        # 跨桶边界的并发提交可能稍晚到达，从新到旧查找
+        for i in range(len(buckets) - 1, -1, -1):
+            if buckets[i][0] == start:
+                return buckets[i][1]
+            if buckets[i][0] < start:
+                buckets.insert(i + 1, (start, Counter()))
+                return buckets[i + 1][1]
+        buckets.appendleft((start, Counter()))
+        return buckets[0][1]
+
+
+# 全局时间序列实例
+vote_timeline = VoteTimeline()
@@ -0,0 +1,161 @@
+"""
+投票批量写入服务
+
+请求线程把已通过资格检查的投票放入队列，由单个写入线程
+按批次在一个事务中提交，减少SQLite的提交与fsync次数。
+"""
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+from backend.models import db, Candidate, Vote
+
+
+class _PendingVote:
+    """待写入的投票"""
+
+    __slots__ = ('candidate_id', 'ip', 'fingerprint', 'user_agent', 'max_votes', 'future')
+
+    def __init__(self, candidate_id: int, ip: str, fingerprint: Optional[str],
+                 user_agent: Optional[str], max_votes: int):
+        self.candidate_id = candidate_id
+        self.ip = ip
+        self.fingerprint = fingerprint
+        self.user_agent = user_agent
+        self.max_votes = max_votes
+        self.future = Future()
+
+
+class VoteWriter:
+    """投票批量写入器（组提交）"""
+
+    def __init__(self):
+        self.app = None
+        self.running = False
+        self.batch_size = 64
+        self.flush_interval = 0.02
+        self.writer_thread = None
+        self._queue = queue.Queue()
+
+    def start(self, app):
+        """
+        启动写入线程
+
+        Args:
+            app: Flask应用实例
+        """
+        if self.running:
+            return
+
+        self.app = app
+        self.batch_size = max(1, app.config['VOTE_WRITER_BATCH_SIZE'])
+        self.flush_interval = max(0, app.config['VOTE_WRITER_FLUSH_INTERVAL_MS']) / 1000.0
+        self.running = True
+        self.writer_thread = threading.Thread(target=self._run, daemon=True)
+        self.writer_thread.start()
+
+    def stop(self):
+        """停止写入线程（队列中剩余的投票会先写入）"""
+        if not self.running:
+            return
+        self.running = False
+        self._queue.put(None)
+        self.writer_thread.join()
+
+    def submit(self, candidate_id: int, ip: str, fingerprint: Optional[str] = None,
+               user_agent: Optional[str] = None, max_votes: int = 1) -> Future:
+        """
+        提交一票到写入队列
+
+        Returns:
+            Future对象，批次提交后返回候选人最新票数；
+            数据库拒绝该票（重复、超额或候选人不存在）时返回None，失败时抛出异常
+        """
+        pending = _PendingVote(candidate_id, ip, fingerprint, user_agent, max_votes)
+        self._queue.put(pending)
+        return pending.future
+
+    def _run(self):
+        """写入线程主循环"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            with self.app.app_context():
+                self._flush(batch)
+
+            if stop:
+                break
+
+    def _flush(self, batch: List[_PendingVote]):
+        """在一个事务中写入一批投票"""
+        try:
+            new_votes, admitted_list = self._write(batch)
+        except Exception as e:
+            db.session.rollback()
+            if len(batch) == 1:
+                batch[0].future.set_exception(e)
+                return
+            # 批次失败时逐条重试，避免一条坏数据拖垮整批
+            for pending in batch:
+                self._flush([pending])
+            return
+        finally:
+            db.session.remove()
+
+        for pending, admitted in zip(batch, admitted_list):
+            pending.future.set_result(new_votes.get(pending.candidate_id) if admitted else None)
+
+    @staticmethod
+    def _write(batch: List[_PendingVote]) -> Tuple[Dict[int, int], List[bool]]:
+        """
+        写入投票记录并更新候选人票数
+
+        Returns:
+            (候选人最新票数, 每一票是否写入成功)
+        """
+        counts = Counter()
+        admitted_list = []
+        for pending in batch:
+            admitted = Vote.admit(
+                pending.candidate_id, pending.ip, pending.fingerprint,
+                pending.user_agent, pending.max_votes
+            )
+            if admitted:
+                counts[pending.candidate_id] += 1
+            admitted_list.append(admitted)
+
+        for candidate_id, count in counts.items():
+            Candidate.increment_votes(candidate_id, count)
+
+        rows = []
+        if counts:
+            rows = db.session.query(Candidate.id, Candidate.votes).filter(
+                Candidate.id.in_(list(counts))
+            ).all()
+        db.session.commit()
+        return dict(rows), admitted_list
+
+
+# 全局写入器实例
+vote_writer = VoteWriter()
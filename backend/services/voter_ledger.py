@@ -0,0 +1,163 @@
+"""
+投票者额度账本
+
+在内存中记录每个投票者（IP + 设备指纹）已投的候选人，
+使投票资格检查无需访问数据库。
+"""
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+from backend.models import db, Vote, VoteConfig
+
+
+# 资格检查结果
+ADMIT_OK = None
+ADMIT_DUPLICATE = 'duplicate'
+ADMIT_QUOTA = 'quota'
+
+
+class VoterLedger:
+    """投票者额度账本"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (IP, 设备指纹) -> 已投候选人ID集合
+        self._voters: Dict[Tuple[str, Optional[str]], Set[int]] = {}
+        # IP -> 各候选人票数（未提供设备指纹时按IP统计）
+        self._ips: Dict[str, Counter] = {}
+        # IP -> 总票数
+        self._ip_totals: Dict[str, int] = {}
+        self._max_votes = 1
+
+    @property
+    def max_votes(self) -> int:
+        """每个用户最大投票数"""
+        return self._max_votes
+
+    @property
+    def voter_count(self) -> int:
+        """不同投票者（IP + 设备指纹）数量"""
+        return len(self._voters)
+
+    def set_max_votes(self, max_votes: int):
+        """更新每个用户最大投票数"""
+        self._max_votes = max_votes
+
+    def load(self):
+        """从数据库加载投票记录（需在应用上下文中调用）"""
+        voters = {}
+        ips = {}
+        ip_totals = {}
+
+        rows = db.session.query(
+            Vote.voter_ip, Vote.device_fingerprint, Vote.candidate_id
+        ).all()
+        for ip, fingerprint, candidate_id in rows:
+            voters.setdefault((ip, fingerprint), set()).add(candidate_id)
+            ips.setdefault(ip, Counter())[candidate_id] += 1
+            ip_totals[ip] = ip_totals.get(ip, 0) + 1
+
+        max_votes = VoteConfig.get_config().max_votes_per_user
+
+        with self._lock:
+            self._voters = voters
+            self._ips = ips
+            self._ip_totals = ip_totals
+            self._max_votes = max_votes
+
+    def clear(self):
+        """清空所有投票记录（投票重置后调用）"""
+        with self._lock:
+            self._voters = {}
+            self._ips = {}
+            self._ip_totals = {}
+
+    def _lookup(self, ip: str, fingerprint: Optional[str]) -> Tuple[int, Set[int]]:
+        """返回投票者的已投票数和已投候选人（调用方需持有锁）"""
+        if fingerprint:
+            voted = self._voters.get((ip, fingerprint), set())
+            return len(voted), voted
+        counter = self._ips.get(ip)
+        if not counter:
+            return 0, set()
+        return self._ip_totals.get(ip, 0), counter.keys()
+
+    def get_vote_count(self, ip: str, fingerprint: Optional[str] = None) -> int:
+        """获取投票者已投票数"""
+        with self._lock:
+            return self._lookup(ip, fingerprint)[0]
+
+    def has_voted(self, ip: str, fingerprint: Optional[str] = None) -> bool:
+        """检查投票者是否已投票"""
+        return self.get_vote_count(ip, fingerprint) > 0
+
+    def reserve(self, ip: str, fingerprint: Optional[str],
+                candidate_id: int) -> Tuple[Optional[str], int]:
+        """
+        检查投票资格并预占一票
+
+        预占成功后，提交失败时必须调用release撤销。
+
+        Args:
+            ip: 投票者IP
+            fingerprint: 设备指纹
+            candidate_id: 候选人ID
+
+        Returns:
+            (检查结果, 预占前已投票数)，检查结果为ADMIT_OK表示通过
+        """
+        with self._lock:
+            count, voted = self._lookup(ip, fingerprint)
+            if candidate_id in voted:
+                return ADMIT_DUPLICATE, count
+            if count >= self._max_votes:
+                return ADMIT_QUOTA, count
+            self._add(ip, fingerprint, candidate_id)
+            return ADMIT_OK, count
+
+    def reserve_ballot(self, ip: str, fingerprint: Optional[str],
+                       candidate_ids: List[int]) -> Tuple[Optional[str], int]:
+        """
+        一次检查并预占整张选票（全部通过或全部拒绝）
+
+        Returns:
+            (检查结果, 预占前已投票数)，检查结果为ADMIT_OK表示通过
+        """
+        with self._lock:
+            count, voted = self._lookup(ip, fingerprint)
+            if any(candidate_id in voted for candidate_id in candidate_ids):
+                return ADMIT_DUPLICATE, count
+            if count + len(candidate_ids) > self._max_votes:
+                return ADMIT_QUOTA, count
+            for candidate_id in candidate_ids:
+                self._add(ip, fingerprint, candidate_id)
+            return ADMIT_OK, count
+
+    def release(self, ip: str, fingerprint: Optional[str], candidate_id: int):
+        """撤销预占的一票"""
+        with self._lock:
+            voted = self._voters.get((ip, fingerprint))
+            if voted is not None:
+                voted.discard(candidate_id)
+                if not voted:
+                    del self._voters[(ip, fingerprint)]
+
+            counter = self._ips.get(ip)
+            if counter is not None and counter[candidate_id] > 0:
+                counter[candidate_id] -= 1
+                if counter[candidate_id] == 0:
+                    del counter[candidate_id]
+                self._ip_totals[ip] -= 1
+                if not counter:
+                    del self._ips[ip]
+                    del self._ip_totals[ip]
+
+    def _add(self, ip: str, fingerprint: Optional[str], candidate_id: int):
+        """记录一票（调用方需持有锁）"""
+        self._voters.setdefault((ip, fingerprint), set()).add(candidate_id)
+        self._ips.setdefault(ip, Counter())[candidate_id] += 1
+        self._ip_totals[ip] = self._ip_totals.get(ip, 0) + 1
+
+
+# 全局账本实例
+voter_ledger = VoterLedger()
@@ -0,0 +1,52 @@
+"""
+候选人紧凑数据格式
+
+默认的候选人对象包含 photo_path/photo_url（通常重复）和 created_at/updated_at，
+投票、抽奖页面和大屏都用不到。紧凑格式按列输出，每个字段只出现一次键名：
+
+    {
+        "schema": "compact/1",
+        "ids": [1, 2],
+        "names": ["张三", "李四"],
+        "photos": ["/uploads/photos/a.jpg", ""],
+        "descriptions": ["", ""],
+        "votes": [3, 5]          # 对投票者隐藏得票数时省略
+    }
+
+通过查询参数 ?schema=compact 或请求头 Accept: application/vnd.vote.compact.v1+json 选择，
+Socket.IO 连接时携带 schema=compact 查询参数。未指定时保持原有格式。
+
+版权所有 (c) 2025 赵宏宇
+"""
+from typing import Any, Dict, List
+from flask import request
+
+COMPACT_SCHEMA = 'compact/1'
+COMPACT_MEDIA_TYPE = 'application/vnd.vote.compact.v1+json'
+
+
+def wants_compact() -> bool:
+    """当前请求是否要求紧凑格式"""
+    if request.args.get('schema') == 'compact':
+        return True
+    return any(mimetype == COMPACT_MEDIA_TYPE for mimetype, _ in request.accept_mimetypes)
+
+
+def to_compact(candidates: List[Dict[str, Any]], include_votes: bool = True) -> Dict[str, Any]:
+    """
+    将候选人列表（to_dict结果）转换为紧凑格式
+
+    Args:
+        candidates: 候选人字典列表
+        include_votes: 是否包含得票数
+    """
+    data = {
+        'schema': COMPACT_SCHEMA,
+        'ids': [c['id'] for c in candidates],
+        'names': [c['name'] for c in candidates],
+        'photos': [c['photo_url'] for c in candidates],
+        'descriptions': [c['description'] or '' for c in candidates],
+    }
+    if include_votes:
+        data['votes'] = [c['votes'] for c in candidates]
+    return data
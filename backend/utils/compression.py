@@ -0,0 +1,188 @@
+"""
+响应压缩
+
+按客户端的 Accept-Encoding 协商压缩方式：安装了 brotli 时优先使用 br，否则使用 gzip。
+    - 接口响应（JSON等）在 after_request 中压缩，小于阈值的响应不压缩
+    - frontend/ 下的页面和脚本启动时预先压缩并缓存，请求时直接发送，不再逐次压缩
+已设置 Content-Encoding 的响应（如公开候选人列表的预压缩版本）和流式响应（SSE、send_file）不处理。
+
+版权所有 (c) 2025 赵宏宇
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from flask import current_app, request, send_from_directory
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 值得压缩的响应类型
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/javascript',
+    'text/plain',
+    'image/svg+xml',
+}
+
+# 启动时预压缩的静态文件扩展名
+PRECOMPRESS_EXTENSIONS = {'.html', '.js', '.css', '.svg', '.txt'}
+
+# 动态压缩使用中等压缩级别（兼顾CPU），预压缩只做一次，使用最高级别
+DYNAMIC_GZIP_LEVEL = 6
+DYNAMIC_BROTLI_QUALITY = 5
+STATIC_GZIP_LEVEL = 9
+STATIC_BROTLI_QUALITY = 11
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    """服务端支持的压缩方式（按优先级）"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding() -> Optional[str]:
+    """根据请求的 Accept-Encoding 选择压缩方式，客户端不支持时返回None"""
+    accepted = request.accept_encodings
+    for encoding in supported_encodings():
+        if accepted[encoding]:
+            return encoding
+    return None
+
+
+def compress(data: bytes, encoding: str, static: bool = False) -> bytes:
+    """
+    压缩数据
+
+    Args:
+        data: 原始数据
+        encoding: 压缩方式（br 或 gzip）
+        static: 是否为预压缩（使用最高压缩级别）
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=STATIC_BROTLI_QUALITY if static else DYNAMIC_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=STATIC_GZIP_LEVEL if static else DYNAMIC_GZIP_LEVEL, mtime=0)
+
+
+class StaticFileCache:
+    """前端静态文件的预压缩缓存"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 文件路径 -> (修改时间, ETag, {压缩方式: 内容}，None为原始内容)
+        self._files: Dict[str, Tuple[float, str, Dict[Optional[str], bytes]]] = {}
+
+    def preload(self, directory: Path) -> int:
+        """
+        预压缩目录下的所有页面和脚本
+
+        Args:
+            directory: 前端目录
+
+        Returns:
+            预压缩的文件数量
+        """
+        count = 0
+        for path in Path(directory).rglob('*'):
+            if path.is_file() and path.suffix.lower() in PRECOMPRESS_EXTENSIONS:
+                self._load(str(path))
+                count += 1
+        return count
+
+    def send(self, directory: Path, filename: str):
+        """
+        发送静态文件，客户端支持时发送预压缩版本
+
+        用法与 send_from_directory 相同；不在预压缩范围内的文件交给 send_from_directory 处理。
+        """
+        path = safe_join(str(directory), filename)
+        if path is None:
+            raise NotFound()
+        if Path(path).suffix.lower() not in PRECOMPRESS_EXTENSIONS or not os.path.isfile(path):
+            return send_from_directory(directory, filename)
+
+        mtime, etag, variants = self._get(path)
+        encoding = negotiate_encoding() if current_app.config['COMPRESSION_ENABLED'] else None
+        if encoding not in variants:
+            encoding = None
+
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        response = current_app.response_class(variants[encoding], mimetype=mimetype)
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        # 不同压缩版本的内容不同，强ETag需要区分
+        response.set_etag(f'{etag}-{encoding}' if encoding else etag)
+        response.last_modified = mtime
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+
+    def _get(self, path: str) -> Tuple[float, str, Dict[Optional[str], bytes]]:
+        """获取缓存，文件修改后重新压缩"""
+        cached = self._files.get(path)
+        if cached is not None and cached[0] == os.path.getmtime(path):
+            return cached
+        return self._load(path)
+
+    def _load(self, path: str) -> Tuple[float, str, Dict[Optional[str], bytes]]:
+        """读取并预压缩文件"""
+        mtime = os.path.getmtime(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        variants = {None: data}
+        for encoding in supported_encodings():
+            compressed = compress(data, encoding, static=True)
+            if len(compressed) < len(data):
+                variants[encoding] = compressed
+
+        entry = (mtime, hashlib.sha1(data).hexdigest()[:16], variants)
+        with self._lock:
+            self._files[path] = entry
+        return entry
+
+
+# 全局静态文件缓存实例
+static_files = StaticFileCache()
+
+
+def init_compression(app):
+    """注册响应压缩（按 COMPRESSION_ENABLED 配置）"""
+    if not app.config['COMPRESSION_ENABLED']:
+        return
+    min_size = app.config['COMPRESSION_MIN_SIZE']
+
+    @app.after_request
+    def compress_response(response):
+        """压缩接口响应"""
+        if (response.status_code != 200
+                or response.direct_passthrough
+                or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return response
+
+        response.set_data(compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        # 强ETag需要区分压缩版本，弱ETag（数据版本）不受影响
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(f'{etag}-{encoding}')
+        return response
@@ -0,0 +1,87 @@
+"""
+数据版本与条件请求
+
+按主题（候选人、票数、抽奖、投票配置）维护单调递增的数据版本号，
+数据变化时递增。GET接口根据所依赖主题的版本号生成弱ETag，
+客户端携带 If-None-Match 且数据未变化时返回 304 空响应，节省热点带宽。
+
+版权所有 (c) 2025 赵宏宇
+"""
+import threading
+import uuid
+import zlib
+from functools import wraps
+from typing import Dict, Tuple
+from flask import current_app, request, session
+
+# 数据主题
+TOPIC_CANDIDATES = 'candidates'  # 候选人资料（新增、修改、删除、导入）
+TOPIC_VOTES = 'votes'  # 得票数（投票、重置）
+TOPIC_LOTTERY = 'lottery'  # 抽奖记录
+TOPIC_CONFIG = 'config'  # 投票配置
+
+
+class DataVersions:
+    """各主题的数据版本号"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        # 进程启动标识：服务重启后版本号从头计数，旧ETag不能再命中
+        self.epoch = uuid.uuid4().hex[:8]
+
+    def bump(self, *topics: str):
+        """递增指定主题的版本号"""
+        with self._lock:
+            for topic in topics:
+                self._versions[topic] = self._versions.get(topic, 0) + 1
+
+    def get(self, *topics: str) -> Tuple[int, ...]:
+        """获取指定主题的版本号"""
+        with self._lock:
+            return tuple(self._versions.get(topic, 0) for topic in topics)
+
+
+# 全局数据版本实例
+data_versions = DataVersions()
+
+
+def _make_etag(topics: Tuple[str, ...]) -> str:
+    """根据主题版本号、查询参数和管理员身份生成ETag"""
+    versions = data_versions.get(*topics)
+    tag = '-'.join(f'{topic[0]}{version}' for topic, version in zip(topics, versions))
+    # 查询参数、Accept请求头（选择数据格式）和登录状态不同，响应内容也不同
+    variant = zlib.crc32(request.query_string + request.headers.get('Accept', '').encode('utf-8'))
+    admin = 'a' if session.get('admin_logged_in') else 'p'
+    return f'{data_versions.epoch}-{tag}-{admin}{variant:x}'
+
+
+def etag(*topics: str, admin_topics: Tuple[str, ...] = ()):
+    """
+    条件请求装饰器：生成弱ETag，数据未变化时返回304
+
+    Args:
+        topics: 响应内容依赖的数据主题
+        admin_topics: 管理员登录时额外依赖的数据主题
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            dependencies = topics + admin_topics if session.get('admin_logged_in') else topics
+            # 先取版本号再生成响应：生成期间数据变化时，下次请求不会误命中
+            tag = _make_etag(dependencies)
+
+            if request.if_none_match.contains_weak(tag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(tag, weak=True)
+            response.vary.add('Accept')
+            # 允许浏览器缓存，但每次使用前都需重新验证
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return decorated_function
+    return decorator
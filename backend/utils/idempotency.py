@@ -0,0 +1,154 @@
+"""
+幂等键缓存
+
+客户端在请求头 Idempotency-Key（或请求体 idempotency_key）中携带幂等键，
+重试同一请求时直接返回首次成功的响应，不再重复执行业务逻辑。
+缓存有容量上限并按过期时间淘汰。
+
+版权所有 (c) 2025 赵宏宇
+"""
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Hashable, Optional, Tuple
+from flask import current_app, jsonify, request
+from backend.utils.response import error_response
+
+# 同一幂等键的请求仍在处理中
+PENDING = object()
+
+
+class _Entry:
+    """缓存条目：处理中或已保存的响应"""
+
+    __slots__ = ('created_at', 'response', 'event')
+
+    def __init__(self):
+        self.created_at = time.monotonic()
+        self.response: Optional[Tuple[Any, int]] = None
+        self.event = threading.Event()
+
+
+class IdempotencyCache:
+    """有界、带过期时间的幂等响应缓存"""
+
+    def __init__(self, max_entries: int = 20000, ttl: float = 600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, _Entry]' = OrderedDict()
+
+    def configure(self, max_entries: int, ttl: float):
+        """根据应用配置设置容量与过期时间"""
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+    def claim(self, key: Hashable, timeout: float = 10):
+        """
+        查询幂等键
+
+        Returns:
+            已保存的响应 (数据, 状态码)；
+            None 表示当前请求已占用该键，处理完后须调用 complete 或 release；
+            PENDING 表示同键请求在超时时间内仍未处理完
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._evict()
+                entry = self._entries.get(key)
+                if entry is None:
+                    self._entries[key] = _Entry()
+                    return None
+                if entry.response is not None:
+                    return entry.response
+                event = entry.event
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not event.wait(remaining):
+                return PENDING
+
+    def complete(self, key: Hashable, payload: Any, status: int = 200):
+        """保存响应，唤醒等待中的重复请求"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            entry.response = (payload, status)
+        entry.event.set()
+
+    def release(self, key: Hashable):
+        """放弃占用（请求失败时调用），重复请求将重新执行"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.event.set()
+
+    def clear(self):
+        """清空缓存（投票重置后调用）"""
+        with self._lock:
+            entries, self._entries = self._entries, OrderedDict()
+        for entry in entries.values():
+            entry.event.set()
+
+    def _evict(self):
+        """淘汰过期和超出容量的条目（调用方需持有锁）"""
+        expire_before = time.monotonic() - self.ttl
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.created_at >= expire_before and len(self._entries) < self.max_entries:
+                break
+            del self._entries[key]
+            entry.event.set()
+
+
+# 投票提交幂等缓存
+vote_idempotency = IdempotencyCache()
+
+
+def idempotent(cache: IdempotencyCache):
+    """
+    幂等装饰器：按 Idempotency-Key 缓存成功响应
+
+    幂等键按客户端IP隔离；失败响应不缓存，重试时重新执行。
+    已受理但仍在处理中的响应（202）也会缓存，重试时不会被当作重复投票。
+
+    Args:
+        cache: 幂等缓存实例
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            idempotency_key = request.headers.get('Idempotency-Key')
+            if not idempotency_key and request.is_json:
+                data = request.get_json(silent=True)
+                if isinstance(data, dict):
+                    idempotency_key = data.get('idempotency_key')
+            if not idempotency_key:
+                return f(*args, **kwargs)
+
+            cache_key = (request.remote_addr or '', request.path, str(idempotency_key)[:128])
+            cached = cache.claim(cache_key, current_app.config['IDEMPOTENCY_WAIT_TIMEOUT'])
+            if cached is PENDING:
+                return error_response('请求正在处理中，请稍候', 409)
+            if cached is not None:
+                payload, status = cached
+                response = jsonify(payload)
+                response.headers['Idempotent-Replayed'] = 'true'
+                return response, status
+
+            try:
+                response = current_app.make_response(f(*args, **kwargs))
+            except Exception:
+                cache.release(cache_key)
+                raise
+
+            payload = response.get_json(silent=True)
+            if response.status_code in (200, 202) and payload and payload.get('success'):
+                cache.complete(cache_key, payload, response.status_code)
+            else:
+                cache.release(cache_key)
+            return response
+        return decorated_function
+    return decorator
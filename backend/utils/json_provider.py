@@ -0,0 +1,74 @@
+"""
+JSON编码器
+
+安装了 orjson 时使用 orjson 编码响应（直接生成bytes，速度快数倍），
+否则回退到标准库 json。两种编码器输出一致：日期时间编码为ISO格式，
+中文直接以UTF-8输出（不转义为 \\uXXXX，响应体更小）。
+
+版权所有 (c) 2025 赵宏宇
+"""
+from datetime import date
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """标准库 json 编码器"""
+
+    ensure_ascii = False
+    sort_keys = False
+
+    @staticmethod
+    def default(o):
+        """日期时间编码为ISO格式，其余类型沿用Flask默认处理"""
+        if isinstance(o, date):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+
+class OrjsonJSONProvider(StdlibJSONProvider):
+    """orjson 编码器"""
+
+    # 允许非字符串键（如 {候选人ID: 票数}），与标准库行为一致
+    options = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def _options(self, indent: bool) -> int:
+        if indent:
+            return self.options | orjson.OPT_INDENT_2
+        return self.options
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=self._options('indent' in kwargs)).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """直接以bytes生成响应体，不经过中间字符串"""
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(
+            obj, default=self.default, option=self._options(indent) | orjson.OPT_APPEND_NEWLINE
+        )
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """
+    根据配置选择JSON编码器
+
+    JSON_PROVIDER: auto（安装了orjson时使用orjson）、orjson、stdlib
+    """
+    choice = app.config['JSON_PROVIDER']
+    if choice == 'orjson' and orjson is None:
+        print('未安装orjson，JSON编码器回退到标准库')
+        choice = 'stdlib'
+    elif choice == 'auto':
+        choice = 'orjson' if orjson is not None else 'stdlib'
+
+    app.json = OrjsonJSONProvider(app) if choice == 'orjson' else StdlibJSONProvider(app)
+    print(f'JSON编码器: {choice}')
@@ -0,0 +1,128 @@
+"""
+游标分页与字段筛选
+
+列表接口支持以下查询参数：
+    page_size: 每页数量，提供后启用分页
+    cursor: 上一页返回的 next_cursor，提供后启用分页
+    fields: 逗号分隔的字段名，只返回这些字段
+
+分页按排序键定位（WHERE 排序键 < 上一页最后一条），不使用 OFFSET，
+翻到第几页耗时都一样。两个参数都不提供时保持原有的完整列表返回。
+
+版权所有 (c) 2025 赵宏宇
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from flask import current_app, request
+from backend.models import db
+
+
+class PageArgs:
+    """解析后的分页参数"""
+
+    def __init__(self, paginate: bool, cursor: Optional[list], page_size: int,
+                 fields: Optional[List[str]]):
+        self.paginate = paginate
+        self.cursor = cursor
+        self.page_size = page_size
+        self.fields = fields
+
+
+def parse_page_args() -> PageArgs:
+    """
+    解析分页参数
+
+    Raises:
+        ValueError: 参数格式错误
+    """
+    cursor = request.args.get('cursor')
+    page_size = request.args.get('page_size')
+    fields = request.args.get('fields')
+
+    paginate = cursor is not None or page_size is not None
+    if page_size is None:
+        page_size = current_app.config['PAGE_SIZE_DEFAULT']
+    else:
+        page_size = int(page_size)
+        if page_size < 1:
+            raise ValueError('page_size必须大于0')
+        page_size = min(page_size, current_app.config['PAGE_SIZE_MAX'])
+
+    if cursor:
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except Exception:
+            raise ValueError('cursor无效')
+        if not isinstance(cursor, list):
+            raise ValueError('cursor无效')
+    else:
+        cursor = None
+
+    if fields:
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+
+    return PageArgs(paginate, cursor, page_size, fields or None)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """将排序键取值编码为游标"""
+    data = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).decode('ascii')
+
+
+def paginate_query(query, order: Sequence[Tuple[Any, bool]], cursor: Optional[list],
+                   page_size: int) -> Tuple[list, Optional[str]]:
+    """
+    按排序键分页查询
+
+    Args:
+        query: SQLAlchemy查询
+        order: [(列, 是否降序)]，最后一列须唯一（通常为主键）
+        cursor: 上一页最后一条的排序键取值
+        page_size: 每页数量
+
+    Returns:
+        (本页记录, 下一页游标)，没有下一页时游标为None
+
+    Raises:
+        ValueError: 游标与排序键不匹配
+    """
+    if cursor is not None:
+        if len(cursor) != len(order):
+            raise ValueError('cursor无效')
+        values = [
+            datetime.fromisoformat(value) if value is not None and column.type.python_type is datetime
+            else value
+            for (column, _), value in zip(order, cursor)
+        ]
+
+        # (a, b, c) 排在上一页最后一条之后：
+        # a越过 或 a相等且b越过 或 a、b相等且c越过
+        conditions = []
+        for i, (column, descending) in enumerate(order):
+            equal = [order[j][0] == values[j] for j in range(i)]
+            beyond = column < values[i] if descending else column > values[i]
+            conditions.append(db.and_(*equal, beyond))
+
+        # 首列的范围条件让数据库直接从索引中定位，而不是从头扫描
+        first, descending = order[0]
+        leading = first <= values[0] if descending else first >= values[0]
+        query = query.filter(leading, db.or_(*conditions))
+
+    query = query.order_by(*(column.desc() if descending else column.asc() for column, descending in order))
+    rows = query.limit(page_size + 1).all()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column, _ in order])
+    return rows, next_cursor
+
+
+def project(items: List[Dict[str, Any]], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """只保留指定字段"""
+    if not fields:
+        return items
+    return [{field: item[field] for field in fields if field in item} for item in items]
@@ -0,0 +1,101 @@
+"""
+接口限流
+
+进程内令牌桶限流：按客户端（IP，可选叠加设备指纹）和路由分别计数，
+超出预算时在访问数据库之前直接返回 429 和 Retry-After。
+令牌桶按最近使用顺序淘汰，内存占用有上限。
+
+版权所有 (c) 2025 赵宏宇
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Hashable
+from flask import current_app, request
+from backend.utils.response import error_response
+
+
+class TokenBucketLimiter:
+    """带LRU淘汰的令牌桶集合"""
+
+    def __init__(self, max_buckets: int = 10000):
+        self.max_buckets = max_buckets
+        self._lock = threading.Lock()
+        # 键 -> [剩余令牌数, 上次补充时间]
+        self._buckets: 'OrderedDict[Hashable, list]' = OrderedDict()
+
+    def hit(self, key: Hashable, rate: float, burst: float) -> float:
+        """
+        消耗一个令牌
+
+        Args:
+            key: 令牌桶键
+            rate: 每秒补充的令牌数
+            burst: 令牌桶容量
+
+        Returns:
+            0 表示放行，否则为需要等待的秒数
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [burst, now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_buckets:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / rate if rate > 0 else 60
+
+    def clear(self):
+        """清空所有令牌桶"""
+        with self._lock:
+            self._buckets.clear()
+
+
+# 全局限流器实例
+rate_limiter = TokenBucketLimiter()
+
+
+def _client_key() -> tuple:
+    """限流客户端标识：IP，可选叠加设备指纹"""
+    ip = request.remote_addr or ''
+    if not current_app.config['RATE_LIMIT_BY_FINGERPRINT']:
+        return (ip,)
+    fingerprint = request.args.get('fingerprint')
+    if fingerprint is None and request.is_json:
+        data = request.get_json(silent=True) or {}
+        fingerprint = data.get('fingerprint') if isinstance(data, dict) else None
+    return (ip, fingerprint)
+
+
+def rate_limit(budget_name: str):
+    """
+    限流装饰器
+
+    Args:
+        budget_name: Config.RATE_LIMITS 中的预算名称
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            budget = current_app.config['RATE_LIMITS'].get(budget_name)
+            if current_app.config['RATE_LIMIT_ENABLED'] and budget:
+                rate, burst = budget
+                retry_after = rate_limiter.hit((budget_name,) + _client_key(), rate, burst)
+                if retry_after:
+                    response, code = error_response('请求过于频繁，请稍后再试', 429)
+                    response.headers['Retry-After'] = str(math.ceil(retry_after))
+                    return response, code
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
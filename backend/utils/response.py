@@ -2,7 +2,7 @@
 响应帮助函数
 """
 from flask import jsonify
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 
 def success_response(data: Any = None, message: str = '操作成功') -> Dict:
@@ -46,6 +46,24 @@ def error_response(message: str = '操作失败', code: int = 400) -> tuple:
     return jsonify(response), code
 
 
+def cursor_response(items: list, next_cursor: Optional[str]) -> Dict:
+    """
+    游标分页响应
+    
+    Args:
+        items: 本页数据列表
+        next_cursor: 下一页游标，没有下一页时为None
+        
+    Returns:
+        响应字典
+    """
+    return success_response({
+        'items': items,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None
+    })
+
+
 def paginate_response(items: list, page: int, per_page: int, total: int) -> Dict:
     """
     分页响应
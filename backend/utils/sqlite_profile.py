@@ -0,0 +1,73 @@
+"""
+SQLite性能配置
+
+为每个新建的数据库连接设置PRAGMA（WAL日志、同步级别、忙等待超时、缓存等），
+并定期执行WAL检查点，避免WAL文件无限增长。
+
+版权所有 (c) 2025 赵宏宇
+"""
+import threading
+import time
+from sqlalchemy import event
+
+
+def _build_pragmas(config) -> list:
+    """根据应用配置生成PRAGMA语句列表"""
+    return [
+        ('journal_mode', config['SQLITE_JOURNAL_MODE']),
+        ('synchronous', config['SQLITE_SYNCHRONOUS']),
+        ('busy_timeout', int(config['SQLITE_BUSY_TIMEOUT_MS'])),
+        # 负数表示以KB为单位
+        ('cache_size', -int(config['SQLITE_CACHE_SIZE_KB'])),
+        ('mmap_size', int(config['SQLITE_MMAP_SIZE'])),
+        ('temp_store', config['SQLITE_TEMP_STORE']),
+    ]
+
+
+def init_sqlite_profile(app, engine):
+    """
+    为SQLite引擎应用性能配置（非SQLite数据库直接跳过）
+
+    Args:
+        app: Flask应用实例
+        engine: SQLAlchemy引擎
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = _build_pragmas(app.config)
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    # 读取实际生效的设置并输出到启动日志
+    with engine.connect() as conn:
+        active = {
+            name: conn.exec_driver_sql(f'PRAGMA {name}').scalar()
+            for name, _ in pragmas
+        }
+    print('SQLite配置: ' + ', '.join(f'{name}={value}' for name, value in active.items()))
+
+    interval = app.config['SQLITE_CHECKPOINT_INTERVAL']
+    if str(active['journal_mode']).lower() == 'wal' and interval > 0:
+        thread = threading.Thread(
+            target=_run_checkpoints, args=(engine, interval), daemon=True
+        )
+        thread.start()
+
+
+def _run_checkpoints(engine, interval: float):
+    """定期执行WAL检查点（PASSIVE模式，不阻塞读写）"""
+    while True:
+        time.sleep(interval)
+        try:
+            with engine.connect() as conn:
+                conn.exec_driver_sql('PRAGMA wal_checkpoint(PASSIVE)')
+        except Exception as e:
+            print(f'WAL检查点失败: {str(e)}')
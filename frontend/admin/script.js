@@ -191,6 +191,18 @@ function initSocket() {
         refreshData();
     });
     
+    socket.on('vote_delta', function(data) {
+        // 增量更新：{候选人ID: 票数}，只更新本地数据，不重新请求列表
+        const votes = data.votes || {};
+        candidates.forEach(c => {
+            if (votes[c.id] !== undefined) {
+                c.votes = votes[c.id];
+            }
+        });
+        updateDashboard();
+        updateRankingTable();
+    });
+    
     socket.on('lottery_result', function(data) {
         console.log('收到抽奖结果:', data);
         loadLotteryHistory();
@@ -0,0 +1,89 @@
+"""
+候选人序列化性能测试
+
+对比 1000 个候选人逐个生成字典（无缓存）与使用序列化缓存的耗时，
+以及投票进行中每轮只有少量候选人票数变化时的耗时。
+
+    python tools/bench_candidate_serialization.py --candidates 1000 --rounds 200
+
+版权所有 (c) 2025 赵宏宇
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models import Candidate
+
+
+def make_candidates(count):
+    """生成内存中的候选人（不访问数据库）"""
+    now = datetime.utcnow()
+    photo_paths = ['', 'photo.jpg', '/uploads/photo.jpg', '/uploads/photos/photo.jpg', 'uploads/photos/photo.jpg']
+    return [
+        Candidate(
+            id=i + 1,
+            name=f'候选人{i + 1}',
+            description='候选人简介' * 4,
+            photo_path=photo_paths[i % len(photo_paths)],
+            votes=i % 50,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now - timedelta(minutes=i)
+        )
+        for i in range(count)
+    ]
+
+
+def bench(name, rounds, func):
+    """执行多轮并输出每轮平均耗时"""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    per_round = (time.perf_counter() - started) / rounds * 1000
+    print(f'{name:<28}{per_round:>10.3f} ms/轮')
+    return per_round
+
+
+def main():
+    parser = argparse.ArgumentParser(description='候选人序列化性能测试')
+    parser.add_argument('--candidates', type=int, default=1000, help='候选人数量')
+    parser.add_argument('--rounds', type=int, default=200, help='测试轮数')
+    parser.add_argument('--changed', type=int, default=10, help='每轮票数变化的候选人数量')
+    args = parser.parse_args()
+
+    candidates = make_candidates(args.candidates)
+    rng = random.Random(2025)
+
+    print('=' * 60)
+    print(f'候选人序列化性能测试: {args.candidates}个候选人, {args.rounds}轮')
+    print('=' * 60)
+
+    uncached = bench('无缓存（_build_dict）', args.rounds,
+                     lambda: [c._build_dict() for c in candidates])
+
+    Candidate._dict_cache.clear()
+    [c.to_dict() for c in candidates]
+    cached = bench('缓存命中（to_dict）', args.rounds,
+                   lambda: [c.to_dict() for c in candidates])
+
+    def vote_round():
+        for c in rng.sample(candidates, args.changed):
+            c.votes += 1
+        return [c.to_dict() for c in candidates]
+
+    voting = bench(f'每轮{args.changed}人票数变化', args.rounds, vote_round)
+
+    # 缓存结果必须与直接生成的结果一致
+    assert all(c.to_dict() == c._build_dict() for c in candidates)
+
+    print('-' * 60)
+    print(f'缓存命中加速: {uncached / cached:.1f}x, 投票进行中加速: {uncached / voting:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+JSON编码器性能测试
+
+用真实模型的 to_dict 结果构造接口响应（候选人列表、抽奖历史、投票记录、统计数据），
+对比标准库与 orjson 编码器生成完整响应（Response对象）的耗时和响应体大小。
+
+    python tools/bench_json.py --candidates 1000 --votes 5000
+
+版权所有 (c) 2025 赵宏宇
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from backend.models import Candidate, Vote, LotteryRecord
+from backend.utils.json_provider import StdlibJSONProvider, OrjsonJSONProvider, orjson
+
+
+def build_payloads(candidate_count, vote_count):
+    """构造与接口一致的响应数据（不访问数据库）"""
+    now = datetime.utcnow()
+    candidates = [
+        Candidate(
+            id=i + 1, name=f'候选人{i + 1}', description='候选人简介' * 4,
+            photo_path=f'photo_{i + 1}.jpg', votes=(i * 7) % 300,
+            created_at=now - timedelta(minutes=i), updated_at=now - timedelta(minutes=i)
+        )
+        for i in range(candidate_count)
+    ]
+    candidate_list = [c.to_dict() for c in candidates]
+
+    votes = []
+    for i in range(vote_count):
+        vote = Vote(
+            id=i + 1, candidate_id=candidates[i % candidate_count].id,
+            voter_ip=f'192.168.137.{2 + i % 250}', device_fingerprint=f'fp{i:08x}',
+            voted_at=now - timedelta(seconds=i)
+        )
+        vote.candidate = candidates[i % candidate_count]
+        votes.append(vote.to_dict())
+
+    history = []
+    for i in range(min(200, candidate_count)):
+        record = LotteryRecord(
+            id=i + 1, candidate_id=candidates[i].id, round=i // 10 + 1,
+            prize_name=f'{i // 10 + 1}等奖', drawn_at=now - timedelta(minutes=i)
+        )
+        record.candidate = candidates[i]
+        history.append(record.to_dict())
+
+    statistics = {
+        'total_votes': vote_count, 'total_candidates': candidate_count, 'unique_voters': vote_count // 3,
+        'avg_votes_per_candidate': round(vote_count / candidate_count, 1), 'vote_completion_rate': 80.0,
+        'max_votes_per_user': 3, 'candidates': candidate_list, 'top_candidate': candidate_list[0]
+    }
+
+    def wrap(data):
+        return {'success': True, 'message': '操作成功', 'data': data}
+
+    return {
+        '候选人列表': wrap(candidate_list),
+        '抽奖历史': wrap(history),
+        '投票记录': wrap(votes),
+        '统计数据': wrap(statistics),
+    }
+
+
+def bench(provider, payload, rounds):
+    """返回每次生成响应的平均耗时（毫秒）和响应体大小"""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        response = provider.response(payload)
+    elapsed = (time.perf_counter() - started) / rounds * 1000
+    return elapsed, len(response.get_data())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON编码器性能测试')
+    parser.add_argument('--candidates', type=int, default=1000, help='候选人数量')
+    parser.add_argument('--votes', type=int, default=5000, help='投票记录数量')
+    parser.add_argument('--rounds', type=int, default=50, help='测试轮数')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    providers = {'stdlib': StdlibJSONProvider(app)}
+    if orjson is not None:
+        providers['orjson'] = OrjsonJSONProvider(app)
+    else:
+        print('未安装orjson，仅测试标准库编码器')
+
+    payloads = build_payloads(args.candidates, args.votes)
+
+    print('=' * 72)
+    print(f'JSON编码器性能测试: {args.candidates}个候选人, {args.votes}条投票记录, {args.rounds}轮')
+    print('=' * 72)
+    print(f"{'响应':<10}" + ''.join(f'{name + "(ms)":>14}{name + "(KB)":>14}' for name in providers) + f"{'加速':>8}")
+
+    with app.app_context():
+        for name, payload in payloads.items():
+            results = {key: bench(provider, payload, args.rounds) for key, provider in providers.items()}
+            line = f'{name:<10}' + ''.join(f'{ms:>14.3f}{size / 1024:>14.1f}' for ms, size in results.values())
+            if 'orjson' in results:
+                line += f"{results['stdlib'][0] / results['orjson'][0]:>7.1f}x"
+                # 两种编码器的结果必须一致
+                assert app.json.loads(providers['orjson'].response(payload).get_data()) == \
+                    app.json.loads(providers['stdlib'].response(payload).get_data())
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+抽奖规模测试
+
+在临时数据库中构造大规模名单（默认 50000 名候选人、10000 名已中奖者），检查：
+    - NOT EXISTS 反连接统计的可抽奖人数和名单与预期完全一致
+    - 抽奖候选池加载结果与数据库一致，多轮抽奖不会抽中已中奖者
+    - 可抽奖人数统计、候选池加载、单次抽奖的耗时不超过上限
+任一检查失败时以非零状态退出。
+
+    python tools/bench_lottery.py --candidates 50000 --winners 10000
+
+版权所有 (c) 2025 赵宏宇
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def timed(func, *args, **kwargs):
+    """执行函数，返回 (结果, 耗时毫秒)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def percentile(values, p):
+    """计算百分位数"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def count_available(exclude_winners: bool = True) -> int:
+    """从数据库统计可抽奖人数（NOT EXISTS 反连接）"""
+    from backend.models import db, Candidate, LotteryRecord
+    query = db.session.query(db.func.count(Candidate.id))
+    if exclude_winners:
+        query = query.filter(LotteryRecord.not_won())
+    return query.scalar()
+
+
+def run(args) -> bool:
+    """执行规模测试，返回是否全部通过"""
+    from backend.app import create_app
+    from backend.models import db, Candidate, LotteryRecord
+    from backend.services.lottery_pool import lottery_pool
+    from backend.services.lottery_service import LotteryService
+
+    app = create_app('production')
+    rng = random.Random(args.seed)
+    failures = []
+
+    def check(ok, message):
+        print(f"  [{'通过' if ok else '失败'}] {message}")
+        if not ok:
+            failures.append(message)
+
+    with app.app_context():
+        print(f'构造数据: {args.candidates} 名候选人, {args.winners} 名已中奖者')
+        db.session.execute(db.insert(Candidate), [
+            {'name': f'候选人{i}', 'photo_path': '', 'description': '', 'votes': 0}
+            for i in range(1, args.candidates + 1)
+        ])
+        winner_ids = rng.sample(range(1, args.candidates + 1), args.winners)
+        db.session.execute(db.insert(LotteryRecord), [
+            {'candidate_id': cid, 'round': index // 100 + 1, 'prize_name': '规模测试'}
+            for index, cid in enumerate(winner_ids)
+        ])
+        db.session.commit()
+        db.session.execute(db.text('ANALYZE'))
+
+        expected = set(range(1, args.candidates + 1)) - set(winner_ids)
+
+        print('反连接查询')
+        count, count_ms = timed(count_available)
+        check(count == len(expected), f'可抽奖人数 {count}（预期 {len(expected)}）')
+        check(count_available(False) == args.candidates, '不排除中奖者时为全部候选人')
+        eligible = {row[0] for row in db.session.query(Candidate.id).filter(LotteryRecord.not_won())}
+        check(eligible == expected, '可抽奖名单与预期一致')
+        check(count_ms <= args.max_query_ms, f'统计耗时 {count_ms:.1f}ms（上限 {args.max_query_ms}ms）')
+
+        print('抽奖候选池')
+        _, load_ms = timed(lottery_pool.load)
+        check(lottery_pool.available_count() == len(expected), f'候选池可抽奖人数 {lottery_pool.available_count()}')
+        check(load_ms <= args.max_load_ms, f'加载耗时 {load_ms:.1f}ms（上限 {args.max_load_ms}ms）')
+
+        print(f'抽奖: {args.rounds} 轮, 每轮 {args.draw_count} 人')
+        drawn = set()
+        draw_times = []
+        for _ in range(args.rounds):
+            result, draw_ms = timed(LotteryService.draw_lottery, args.draw_count, '规模测试')
+            draw_times.append(draw_ms)
+            if not result['success']:
+                check(False, f"抽奖失败: {result['message']}")
+                break
+            ids = {w['id'] for w in result['winners']}
+            if len(ids) != args.draw_count or not ids <= expected or ids & drawn:
+                check(False, f"第 {result['round']} 轮抽中了重复或已中奖的候选人")
+                break
+            drawn |= ids
+        check(len(drawn) == args.rounds * args.draw_count, f'共抽中 {len(drawn)} 人，均为未中奖者且互不重复')
+
+        remaining = len(expected) - len(drawn)
+        check(count_available() == remaining, f'数据库可抽奖人数 {remaining}')
+        check(lottery_pool.available_count() == remaining, '候选池可抽奖人数与数据库一致')
+        verify = lottery_pool.verify()
+        check(verify['consistent'], f"候选池核对: {'一致' if verify['consistent'] else '; '.join(verify['differences'])}")
+        p95 = percentile(draw_times, 0.95)
+        check(p95 <= args.max_draw_ms, f'抽奖耗时 p50 {percentile(draw_times, 0.5):.1f}ms, '
+                                       f'p95 {p95:.1f}ms（上限 {args.max_draw_ms}ms）')
+
+    print('=' * 60)
+    print('全部通过' if not failures else f'{len(failures)} 项失败')
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='抽奖规模测试')
+    parser.add_argument('--candidates', type=int, default=50000, help='候选人数量')
+    parser.add_argument('--winners', type=int, default=10000, help='已中奖人数')
+    parser.add_argument('--rounds', type=int, default=20, help='抽奖轮数')
+    parser.add_argument('--draw-count', type=int, default=10, help='每轮抽取人数')
+    parser.add_argument('--max-query-ms', type=float, default=200, help='可抽奖人数统计耗时上限（毫秒）')
+    parser.add_argument('--max-load-ms', type=float, default=1000, help='候选池加载耗时上限（毫秒）')
+    parser.add_argument('--max-draw-ms', type=float, default=50, help='单次抽奖 p95 耗时上限（毫秒）')
+    parser.add_argument('--seed', type=int, default=2025, help='随机数种子')
+    args = parser.parse_args()
+
+    if args.winners + args.rounds * args.draw_count > args.candidates:
+        parser.error('已中奖人数与抽取人数之和不能超过候选人数量')
+
+    # 使用临时数据库，不影响现有数据
+    workdir = tempfile.mkdtemp(prefix='bench_lottery_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'lottery.db')}"
+    try:
+        ok = run(args)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+高频查询计划检查
+
+在临时数据库中写入少量数据并执行 ANALYZE，用 EXPLAIN QUERY PLAN 检查
+投票、排行榜、抽奖等高频查询是否走索引。任一查询出现全表扫描时以非零状态退出，
+可在修改模型或查询后运行，防止索引失效。
+
+    python tools/check_query_plans.py
+
+版权所有 (c) 2025 赵宏宇
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run(args) -> bool:
+    """检查全部高频查询，返回是否全部走索引"""
+    from backend.app import create_app
+    from backend.models import db, Candidate, Vote, LotteryRecord
+    from backend.models.upgrade import check_query_plans, find_full_scans
+
+    app = create_app('production')
+    with app.app_context():
+        # 有数据并执行 ANALYZE 后，查询计划与现场数据库一致
+        db.session.execute(db.insert(Candidate), [
+            {'name': f'候选人{i}', 'photo_path': '', 'description': '', 'votes': 0}
+            for i in range(1, args.candidates + 1)
+        ])
+        db.session.execute(db.insert(Vote), [
+            {'candidate_id': i % args.candidates + 1, 'voter_ip': f'192.168.137.{i % 250}',
+             'device_fingerprint': f'fp{i}'}
+            for i in range(args.votes)
+        ])
+        db.session.execute(db.insert(LotteryRecord), [
+            {'candidate_id': i, 'round': 1, 'prize_name': '检查'}
+            for i in range(1, args.candidates // 10 + 1)
+        ])
+        db.session.commit()
+        db.session.execute(db.text('ANALYZE'))
+
+        plans = check_query_plans()
+
+    failures = 0
+    for name, details in plans.items():
+        full_scans = find_full_scans(details)
+        print(f"[{'失败' if full_scans else '通过'}] {name}")
+        for detail in details:
+            print(f'    {detail}')
+        failures += bool(full_scans)
+
+    print('=' * 60)
+    if not plans:
+        print('未检查任何查询（仅支持SQLite）')
+        return False
+    print('全部走索引' if not failures else f'{failures} 个查询出现全表扫描')
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='高频查询计划检查')
+    parser.add_argument('--candidates', type=int, default=200, help='候选人数量')
+    parser.add_argument('--votes', type=int, default=2000, help='投票记录数量')
+    args = parser.parse_args()
+
+    # 使用临时数据库，不影响现有数据
+    workdir = tempfile.mkdtemp(prefix='check_query_plans_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'plans.db')}"
+    try:
+        ok = run(args)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,503 @@
+"""
+投票现场压力测试工具
+
+模拟 N 部手机：打开投票页 → 获取候选人和投票配置 → 连接 Socket.IO →
+按随机思考时间逐票投票 → 查询统计。统计各接口的 p50/p95/p99 延迟、错误率、
+限流率（429 单独统计，不计入错误），以及从投票成功到管理端收到票数增量的广播延迟。
+
+两种运行方式（均可离线运行）：
+    # 进程内运行：使用临时数据库直接调用 create_app()
+    python tools/loadtest.py --phones 300
+
+    # 对已启动的本地服务器运行（需管理员账号用于观察广播）
+    RATE_LIMIT_ENABLED=false python run.py
+    python tools/loadtest.py --url http://127.0.0.1:5000 --phones 300
+
+远程模式下所有手机都从本机的同一个IP发出请求，服务器按IP限流时大部分请求会被429拒绝。
+压测前请以 RATE_LIMIT_ENABLED=false 启动服务器，或在配置中开启 RATE_LIMIT_BY_FINGERPRINT
+（按 IP + 设备指纹限流，每部手机使用独立的设备指纹）。
+远程模式的手机 Socket.IO 连接和管理端广播观察需要 python-socketio 客户端依赖。
+
+随机数种子固定，相同参数在不同提交之间的结果可以直接对比；
+使用 --json 保存结果。
+
+版权所有 (c) 2025 赵宏宇
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from http.cookiejar import CookieJar
+
+# 添加项目根目录到 Python 路径
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+
+def percentile(values, pct):
+    """最近秩法计算百分位数"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+class Recorder:
+    """线程安全的延迟与错误记录"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        # 被限流（429）的请求单独统计，不计入错误
+        self.limited = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        # 投票成功：(完成时间, 候选人ID, 该候选人最新票数)
+        self.votes = []
+
+    def record(self, endpoint, elapsed, status, ok):
+        with self._lock:
+            self.latencies[endpoint].append(elapsed)
+            self.statuses[endpoint][status] += 1
+            if status == 429:
+                self.limited[endpoint] += 1
+            elif not ok:
+                self.errors[endpoint] += 1
+
+    def record_vote(self, finished_at, candidate_id, votes):
+        with self._lock:
+            self.votes.append((finished_at, candidate_id, votes))
+
+
+# ============ 客户端适配 ============
+
+class InProcessClient:
+    """进程内HTTP客户端（Flask test_client）"""
+
+    def __init__(self, app, ip):
+        self.client = app.test_client()
+        self.client.environ_base['REMOTE_ADDR'] = ip
+
+    def get(self, path):
+        response = self.client.get(path)
+        return response.status_code, response.get_json(silent=True)
+
+    def post(self, path, body, headers=None):
+        response = self.client.post(path, json=body, headers=headers or {})
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpClient:
+    """通过HTTP访问本地服务器的客户端"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.cookies = CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+
+    def _open(self, request):
+        try:
+            with self.opener.open(request, timeout=30) as response:
+                body = response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            body = e.read()
+            status = e.code
+        try:
+            return status, json.loads(body)
+        except ValueError:
+            return status, None
+
+    def get(self, path):
+        return self._open(urllib.request.Request(self.base_url + path))
+
+    def post(self, path, body, headers=None):
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=json.dumps(body).encode('utf-8'),
+            headers={'Content-Type': 'application/json', **(headers or {})},
+            method='POST'
+        )
+        return self._open(request)
+
+    def cookie_header(self):
+        return '; '.join(f'{c.name}={c.value}' for c in self.cookies)
+
+
+class DeltaObserver:
+    """管理端观察者：记录每条 vote_delta 的到达时间"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (到达时间, {候选人ID: 票数})
+        self.deltas = []
+        self.running = True
+
+    def on_delta(self, data):
+        now = time.perf_counter()
+        votes = {int(k): v for k, v in (data or {}).get('votes', {}).items()}
+        with self._lock:
+            self.deltas.append((now, votes))
+
+    def fanout_delays(self, votes):
+        """计算每张成功投票从请求完成到管理端收到对应增量的延迟"""
+        with self._lock:
+            deltas = list(self.deltas)
+        delays = []
+        missed = 0
+        for finished_at, candidate_id, count in votes:
+            for arrived_at, delta in deltas:
+                if delta.get(candidate_id, -1) >= count and arrived_at >= finished_at - 1.0:
+                    delays.append(max(0.0, arrived_at - finished_at))
+                    break
+            else:
+                missed += 1
+        return delays, missed
+
+
+def start_inprocess_observer(app, socketio, observer):
+    """进程内：以管理员身份连接Socket.IO并轮询接收消息"""
+    admin = app.test_client()
+    admin.post('/api/admin/login', json={
+        'username': app.config['ADMIN_USERNAME'],
+        'password': app.config['ADMIN_PASSWORD']
+    })
+    sio = socketio.test_client(app, flask_test_client=admin)
+
+    def poll():
+        while observer.running:
+            for message in sio.get_received():
+                if message['name'] == 'vote_delta':
+                    observer.on_delta(message['args'][0])
+            time.sleep(0.005)
+        sio.disconnect()
+
+    thread = threading.Thread(target=poll, daemon=True)
+    thread.start()
+    return thread
+
+
+def start_remote_observer(base_url, username, password, observer):
+    """远程：以管理员身份连接Socket.IO（需安装 python-socketio 客户端依赖）"""
+    try:
+        import socketio as socketio_client
+        sio = socketio_client.Client(reconnection=False)
+    except Exception as e:
+        print(f'无法创建Socket.IO客户端，跳过广播延迟统计: {e}')
+        return None
+
+    admin = HttpClient(base_url)
+    status, _ = admin.post('/api/admin/login', {'username': username, 'password': password})
+    if status != 200:
+        print('管理员登录失败，跳过广播延迟统计')
+        return None
+
+    sio.on('vote_delta', observer.on_delta)
+    try:
+        sio.connect(base_url, headers={'Cookie': admin.cookie_header()})
+    except Exception as e:
+        print(f'Socket.IO连接失败，跳过广播延迟统计: {e}')
+        return None
+    return sio
+
+
+def remote_socket_factory(base_url):
+    """远程：为每部手机创建Socket.IO连接（携带该手机的Cookie）"""
+    try:
+        import socketio as socketio_client
+    except ImportError as e:
+        print(f'无法导入Socket.IO客户端，手机不建立Socket.IO连接: {e}')
+        return None
+
+    def factory(client):
+        def connect():
+            sio = socketio_client.Client(reconnection=False)
+            sio.connect(base_url, headers={'Cookie': client.cookie_header()})
+            return sio
+        return connect
+    return factory
+
+
+# ============ 手机模拟 ============
+
+def simulate_phone(index, client, recorder, rng, args, connect_socket):
+    """模拟一部手机的完整投票流程"""
+    fingerprint = f'loadtest-{args.seed}-{index}'
+
+    def call(endpoint, method, path, body=None, headers=None):
+        started = time.perf_counter()
+        try:
+            if method == 'GET':
+                status, data = client.get(path)
+            else:
+                status, data = client.post(path, body, headers)
+        except Exception:
+            recorder.record(endpoint, time.perf_counter() - started, 'exception', False)
+            return None, None
+        elapsed = time.perf_counter() - started
+        # 202：投票已受理、仍在写入队列中
+        ok = status in (200, 202) and (data is None or data.get('success', True))
+        recorder.record(endpoint, elapsed, status, ok)
+        return status, data
+
+    def think(low, high):
+        time.sleep(rng.uniform(low, high) * args.think_scale)
+
+    # 扫码进入投票页，均匀分布在开场窗口内
+    time.sleep(rng.uniform(0, args.ramp))
+    call('page /vote', 'GET', '/vote')
+    _, candidates = call('GET candidates', 'GET', '/api/vote/candidates')
+    _, config = call('GET config', 'GET', f'/api/vote/config?fingerprint={fingerprint}')
+
+    sio = None
+    if connect_socket:
+        started = time.perf_counter()
+        try:
+            sio = connect_socket()
+            recorder.record('socket connect', time.perf_counter() - started, 'connected', True)
+        except Exception:
+            recorder.record('socket connect', time.perf_counter() - started, 'exception', False)
+
+    candidate_ids = [c['id'] for c in (candidates or {}).get('data', [])]
+    max_votes = ((config or {}).get('data') or {}).get('max_votes_per_user', 1)
+    if not candidate_ids:
+        return
+
+    # 浏览候选人后逐票投票
+    choices = rng.sample(candidate_ids, min(max_votes, len(candidate_ids)))
+    for candidate_id in choices:
+        think(1.0, 5.0)
+        body = {'candidate_id': candidate_id, 'fingerprint': fingerprint}
+        headers = {'Idempotency-Key': uuid.uuid4().hex}
+        status, data = call('POST submit', 'POST', '/api/vote/submit', body, headers)
+        if status == 200 and data and data.get('success'):
+            votes = data['data']['candidate']['votes']
+            recorder.record_vote(time.perf_counter(), candidate_id, votes)
+
+    think(0.5, 2.0)
+    call('GET check', 'GET', f'/api/vote/check?fingerprint={fingerprint}')
+    # 携带设备指纹，服务器按 IP + 设备指纹限流时每部手机单独计数
+    call('GET statistics', 'GET', f'/api/vote/statistics?fingerprint={fingerprint}')
+
+    if sio is not None:
+        sio.disconnect()
+
+
+# ============ 报告 ============
+
+def git_revision():
+    """当前提交（用于跨提交对比）"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def build_report(recorder, observer, duration, args):
+    """汇总测试结果"""
+    endpoints = {}
+    for endpoint, values in sorted(recorder.latencies.items()):
+        errors = recorder.errors.get(endpoint, 0)
+        limited = recorder.limited.get(endpoint, 0)
+        endpoints[endpoint] = {
+            'requests': len(values),
+            'errors': errors,
+            'error_rate': round(errors / len(values), 4) if values else 0,
+            'rate_limited': limited,
+            'rate_limited_rate': round(limited / len(values), 4) if values else 0,
+            'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p95_ms': round(percentile(values, 95) * 1000, 2),
+            'p99_ms': round(percentile(values, 99) * 1000, 2),
+            'max_ms': round(max(values) * 1000, 2),
+            'status': {str(k): v for k, v in recorder.statuses[endpoint].items()},
+        }
+
+    fanout = None
+    if observer is not None:
+        delays, missed = observer.fanout_delays(recorder.votes)
+        fanout = {
+            'votes': len(recorder.votes),
+            'observed': len(delays),
+            'missed': missed,
+            'p50_ms': round(percentile(delays, 50) * 1000, 2) if delays else None,
+            'p95_ms': round(percentile(delays, 95) * 1000, 2) if delays else None,
+            'p99_ms': round(percentile(delays, 99) * 1000, 2) if delays else None,
+        }
+
+    return {
+        'revision': git_revision(),
+        'mode': 'remote' if args.url else 'in-process',
+        'params': {
+            'phones': args.phones,
+            'candidates': args.candidates,
+            'max_votes': args.max_votes,
+            'ramp': args.ramp,
+            'think_scale': args.think_scale,
+            'seed': args.seed,
+        },
+        'duration_s': round(duration, 2),
+        'successful_votes': len(recorder.votes),
+        'votes_per_second': round(len(recorder.votes) / duration, 2) if duration else 0,
+        'endpoints': endpoints,
+        'broadcast_fanout': fanout,
+    }
+
+
+def print_report(report):
+    """打印结果表格"""
+    print('=' * 78)
+    print(f"压力测试结果  模式: {report['mode']}  提交: {report['revision']}  "
+          f"耗时: {report['duration_s']}s")
+    print(f"成功投票: {report['successful_votes']}  吞吐: {report['votes_per_second']} 票/秒")
+    print('-' * 78)
+    print(f"{'接口':<18}{'请求数':>8}{'错误率':>9}{'限流率':>9}"
+          f"{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}")
+    for endpoint, stats in report['endpoints'].items():
+        print(f"{endpoint:<20}{stats['requests']:>8}{stats['error_rate'] * 100:>8.2f}%"
+              f"{stats['rate_limited_rate'] * 100:>8.2f}%"
+              f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['max_ms']:>10}")
+    fanout = report['broadcast_fanout']
+    if fanout:
+        print('-' * 78)
+        print(f"广播延迟（投票成功 → 管理端收到增量）: 观察到 {fanout['observed']}/{fanout['votes']}  "
+              f"p50={fanout['p50_ms']}ms p95={fanout['p95_ms']}ms p99={fanout['p99_ms']}ms")
+    if any(stats['rate_limited'] for stats in report['endpoints'].values()):
+        print('-' * 78)
+        print('注意: 出现限流响应（429），测得的是限流而非服务器容量。'
+              '请以 RATE_LIMIT_ENABLED=false 启动服务器或开启 RATE_LIMIT_BY_FINGERPRINT 后重新测试')
+    print('=' * 78)
+
+
+# ============ 主流程 ============
+
+def run_inprocess(args, recorder):
+    """进程内运行：临时数据库 + create_app()"""
+    workdir = tempfile.mkdtemp(prefix='loadtest_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'loadtest.db')}"
+    try:
+        from backend.app import create_app, socketio
+        from backend.models import db, Candidate
+        from backend.models.vote_config import VoteConfig
+        from backend.services.voter_ledger import voter_ledger
+        from backend.services.vote_stats import vote_stats
+        from backend.services.candidate_search import candidate_search
+        from backend.services.lottery_pool import lottery_pool
+        from backend.utils.data_version import data_versions, TOPIC_CANDIDATES
+
+        app = create_app('production')
+        with app.app_context():
+            db.session.add_all(Candidate(name=f'候选人{i + 1}', description='') for i in range(args.candidates))
+            db.session.commit()
+            # 与管理端批量导入相同：刷新各内存结构和公开列表版本，否则统计等接口仍是空数据
+            Candidate.clear_dict_cache()
+            vote_stats.rebuild()
+            candidate_search.rebuild()
+            lottery_pool.load()
+            data_versions.bump(TOPIC_CANDIDATES)
+            VoteConfig.update_config(max_votes_per_user=args.max_votes)
+            voter_ledger.load()
+
+        observer = DeltaObserver()
+        observer_thread = start_inprocess_observer(app, socketio, observer)
+
+        def make_client(index):
+            # 每部手机使用独立的热点IP
+            return InProcessClient(app, f'192.168.{137 + index // 250}.{2 + index % 250}')
+
+        def connect_socket_factory(client):
+            def connect():
+                return socketio.test_client(app, flask_test_client=client.client)
+            return connect
+
+        duration = run_phones(args, recorder, make_client, connect_socket_factory)
+
+        # 等待最后一个广播周期
+        time.sleep(app.config['VOTE_BROADCAST_INTERVAL_MS'] / 1000.0 * 2 + 0.1)
+        observer.running = False
+        observer_thread.join()
+        return observer, duration
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_remote(args, recorder):
+    """对已启动的服务器运行"""
+    observer = DeltaObserver()
+    sio = start_remote_observer(args.url, args.admin_user, args.admin_password, observer)
+
+    def make_client(index):
+        return HttpClient(args.url)
+
+    duration = run_phones(args, recorder, make_client, remote_socket_factory(args.url))
+
+    time.sleep(1.0)
+    if sio is None:
+        return None, duration
+    sio.disconnect()
+    return observer, duration
+
+
+def run_phones(args, recorder, make_client, connect_socket_factory):
+    """启动所有手机线程并等待完成，返回耗时"""
+    threads = []
+    started = time.perf_counter()
+    for index in range(args.phones):
+        client = make_client(index)
+        rng = random.Random(args.seed * 100003 + index)
+        connect = connect_socket_factory(client) if connect_socket_factory else None
+        thread = threading.Thread(
+            target=simulate_phone,
+            args=(index, client, recorder, rng, args, connect),
+            daemon=True
+        )
+        threads.append(thread)
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='投票现场压力测试')
+    parser.add_argument('--url', help='服务器地址（不指定则进程内运行；服务器需关闭按IP限流，见模块说明）')
+    parser.add_argument('--phones', type=int, default=300, help='模拟手机数量')
+    parser.add_argument('--candidates', type=int, default=30, help='候选人数量（仅进程内模式）')
+    parser.add_argument('--max-votes', type=int, default=3, help='每人票数（仅进程内模式）')
+    parser.add_argument('--ramp', type=float, default=10.0, help='手机进入投票页的时间窗口（秒）')
+    parser.add_argument('--think-scale', type=float, default=1.0, help='思考时间缩放系数，0表示不等待')
+    parser.add_argument('--seed', type=int, default=2025, help='随机数种子')
+    parser.add_argument('--admin-user', default='admin', help='管理员用户名（远程模式）')
+    parser.add_argument('--admin-password', default='admin123', help='管理员密码（远程模式）')
+    parser.add_argument('--json', help='将结果保存为JSON文件')
+    args = parser.parse_args()
+
+    recorder = Recorder()
+    if args.url:
+        observer, duration = run_remote(args, recorder)
+    else:
+        observer, duration = run_inprocess(args, recorder)
+
+    report = build_report(recorder, observer, duration, args)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f'结果已保存: {args.json}')
+
+
+if __name__ == '__main__':
+    main()